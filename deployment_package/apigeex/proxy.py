@@ -3,22 +3,75 @@ ApigeeX proxy setup for Stage/Prod environments
 Integrates with internal auth service
 """
 
-import requests
+import httpx
 import json
 import logging
-from typing import Dict, Any
+from functools import cached_property
+from typing import Dict, Any, Optional
 
 logger = logging.getLogger(__name__)
 
+# Proxy bundle rendered to JSON once, only the model name varies
+_PROXY_BUNDLE_TEMPLATE = json.dumps({
+    "name": "__NAME__-proxy",
+    "basePath": "/v1/__NAME__",
+    "targetEndpoint": {
+        "url": "{{lambda_invoke_url}}"  # Will be replaced with actual Lambda URL
+    },
+    "policies": [
+        {
+            "name": "VerifyJWT",
+            "type": "VerifyJWT",
+            "config": {
+                "issuer": "internal-auth-service",
+                "audience": "__NAME__"
+            }
+        },
+        {
+            "name": "QuotaPolicy",
+            "type": "Quota",
+            "config": {
+                "allow": 1000,
+                "interval": 1,
+                "timeUnit": "minute"
+            }
+        },
+        {
+            "name": "SpikeArrest",
+            "type": "SpikeArrest",
+            "config": {
+                "rate": "100ps"
+            }
+        }
+    ]
+}, separators=(",", ":")).encode()
+
 
 class ApigeeXSetup:
     """Setup ApigeeX proxy for production environments"""
     
-    def __init__(self, apigee_org: str, apigee_env: str):
+    def __init__(self, apigee_org: str, apigee_env: str, token: Optional[str] = None):
         self.apigee_org = apigee_org
         self.apigee_env = apigee_env
+        self.token = token
         self.base_url = f"https://apigee.googleapis.com/v1/organizations/{apigee_org}"
     
+    @cached_property
+    def http(self) -> httpx.Client:
+        """Shared HTTP/2 client so all ApigeeX calls reuse one connection"""
+        headers = {"Authorization": f"Bearer {self.token}"} if self.token else {}
+        return httpx.Client(
+            http2=True,
+            base_url=self.base_url,
+            timeout=30,
+            headers=headers
+        )
+    
+    def close(self):
+        """Close the HTTP client if it was opened"""
+        if "http" in self.__dict__:
+            self.http.close()
+    
     def setup_apigeex_proxy(self, config) -> Dict[str, Any]:
         """
         Setup ApigeeX proxy with auth integration
@@ -51,53 +104,24 @@ class ApigeeXSetup:
             "auth_type": "OAuth/JWT via Internal Auth Service"
         }
     
-    def _create_proxy_bundle(self, config) -> Dict[str, Any]:
+    def _create_proxy_bundle(self, config) -> bytes:
         """Create ApigeeX proxy bundle"""
         # Simplified proxy configuration
         # In production, this would generate a full proxy bundle ZIP
         
-        proxy_config = {
-            "name": f"{config.name}-proxy",
-            "basePath": f"/v1/{config.name}",
-            "targetEndpoint": {
-                "url": "{{lambda_invoke_url}}"  # Will be replaced with actual Lambda URL
-            },
-            "policies": [
-                {
-                    "name": "VerifyJWT",
-                    "type": "VerifyJWT",
-                    "config": {
-                        "issuer": "internal-auth-service",
-                        "audience": config.name
-                    }
-                },
-                {
-                    "name": "QuotaPolicy",
-                    "type": "Quota",
-                    "config": {
-                        "allow": 1000,
-                        "interval": 1,
-                        "timeUnit": "minute"
-                    }
-                },
-                {
-                    "name": "SpikeArrest",
-                    "type": "SpikeArrest",
-                    "config": {
-                        "rate": "100ps"
-                    }
-                }
-            ]
-        }
+        # Escape the name for embedding in the pre-rendered JSON
+        name = json.dumps(config.name)[1:-1].encode()
+        proxy_config = _PROXY_BUNDLE_TEMPLATE.replace(b"__NAME__", name)
         
         logger.info("Generated proxy bundle configuration")
         return proxy_config
     
-    def _deploy_proxy(self, proxy_name: str, proxy_bundle: Dict[str, Any],
+    def _deploy_proxy(self, proxy_name: str, proxy_bundle: bytes,
                      config) -> str:
         """Deploy proxy to ApigeeX"""
         # Note: Actual ApigeeX deployment requires OAuth token and proper API calls
-        # This is a simplified version
+        # This is a simplified version; uploads and revision deploys should go
+        # through self.http so they share one HTTP/2 connection
         
         logger.info(f"Deploying proxy to environment: {self.apigee_env}")
         
@@ -128,5 +152,8 @@ def setup_apigeex_proxy(config):
     apigee_org = os.getenv("APIGEE_ORG", "syngenta")
     apigee_env = config.environment
     
-    setup = ApigeeXSetup(apigee_org, apigee_env)
-    return setup.setup_apigeex_proxy(config)
+    setup = ApigeeXSetup(apigee_org, apigee_env, token=os.getenv("APIGEE_TOKEN"))
+    try:
+        return setup.setup_apigeex_proxy(config)
+    finally:
+        setup.close()
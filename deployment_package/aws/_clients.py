@@ -0,0 +1,29 @@
+"""
+Shared boto3 session and client factory
+One session per process so endpoint resolution, credentials and
+connection pools are set up once for all deployers
+"""
+
+import functools
+import threading
+from typing import Optional
+
+import boto3
+from botocore.config import Config
+
+_SESSION = boto3.session.Session()
+_LOCK = threading.Lock()
+
+_CONFIG = Config(
+    retries={'max_attempts': 10, 'mode': 'adaptive'},
+    tcp_keepalive=True,
+    max_pool_connections=32
+)
+
+
+@functools.lru_cache(maxsize=None)
+def client(service: str, region: Optional[str] = None):
+    """Get a cached boto3 client for service/region"""
+    # boto3 sessions are not thread-safe for client creation
+    with _LOCK:
+        return _SESSION.client(service, region_name=region, config=_CONFIG)
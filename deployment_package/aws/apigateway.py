@@ -3,22 +3,38 @@ API Gateway setup with Cognito authentication
 Dev environment only
 """
 
-import boto3
-import json
+import functools
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any
 
+from ._clients import client
+
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=1)
+def _account_id() -> str:
+    """AWS account ID, looked up once per process"""
+    return client('sts').get_caller_identity()['Account']
+
+
 class APIGatewaySetup:
     """Setup API Gateway with Cognito authentication"""
     
     def __init__(self, region: str = "eu-central-1"):
-        self.apigateway = boto3.client('apigateway', region_name=region)
-        self.cognito = boto3.client('cognito-idp', region_name=region)
         self.region = region
     
+    @functools.cached_property
+    def apigateway(self):
+        """API Gateway client, created on first use"""
+        return client('apigateway', self.region)
+    
+    @functools.cached_property
+    def cognito(self):
+        """Cognito Identity Provider client, created on first use"""
+        return client('cognito-idp', self.region)
+    
     def setup_api_gateway_with_cognito(self, config, lambda_arn: str) -> Dict[str, Any]:
         """
         Setup API Gateway with Cognito authorizer
@@ -34,28 +50,33 @@ class APIGatewaySetup:
         
         logger.info(f"Setting up API Gateway: {api_name}")
         
-        # Create or get Cognito User Pool
-        user_pool_id = self._get_or_create_user_pool(config)
-        
-        # Create Cognito App Client
-        app_client_id = self._create_app_client(user_pool_id, config)
-        
-        # Create REST API
-        api_id = self._create_rest_api(api_name, config)
-        
-        # Create Cognito authorizer
-        authorizer_id = self._create_cognito_authorizer(
-            api_id, user_pool_id, config
-        )
-        
-        # Create resources and methods
-        resource_id = self._create_resources(api_id, lambda_arn, authorizer_id)
-        
-        # Deploy API
-        endpoint_url = self._deploy_api(api_id, config.environment)
-        
-        # Generate API key
-        api_key = self._create_api_key(api_id, config)
+        # boto3 clients are thread-safe, so independent calls are overlapped
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            # Create or get Cognito User Pool and REST API
+            pool_future = executor.submit(self._get_or_create_user_pool, config)
+            api_future = executor.submit(self._create_rest_api, api_name, config)
+            user_pool_id = pool_future.result()
+            api_id = api_future.result()
+            
+            # Create Cognito App Client and API key
+            app_client_future = executor.submit(
+                self._create_app_client, user_pool_id, config
+            )
+            api_key_future = executor.submit(self._create_api_key, api_id, config)
+            
+            # Create Cognito authorizer
+            authorizer_id = self._create_cognito_authorizer(
+                api_id, user_pool_id, config
+            )
+            
+            # Create resources and methods
+            resource_id = self._create_resources(api_id, lambda_arn, authorizer_id)
+            
+            # Deploy API
+            endpoint_url = self._deploy_api(api_id, config.environment)
+            
+            app_client_id = app_client_future.result()
+            api_key = api_key_future.result()
         
         logger.info(f"✅ API Gateway setup complete: {endpoint_url}")
         
@@ -72,13 +93,14 @@ class APIGatewaySetup:
         pool_name = f"ie2-user-pool-{config.environment}"
         
         try:
-            # List existing pools
-            response = self.cognito.list_user_pools(MaxResults=50)
-            for pool in response.get('UserPools', []):
-                if pool['Name'] == pool_name:
-                    logger.info(f"Using existing user pool: {pool['Id']}")
-                    return pool['Id']
-        except Exception as e:
+            # List existing pools page by page, stopping at the first match
+            paginator = self.cognito.get_paginator('list_user_pools')
+            for page in paginator.paginate(PaginationConfig={'PageSize': 60}):
+                for pool in page.get('UserPools', []):
+                    if pool['Name'] == pool_name:
+                        logger.info(f"Using existing user pool: {pool['Id']}")
+                        return pool['Id']
+        except self.cognito.exceptions.ClientError as e:
             logger.warning(f"Error listing user pools: {e}")
         
         # Create new pool
@@ -127,13 +149,14 @@ class APIGatewaySetup:
     def _create_rest_api(self, api_name: str, config) -> str:
         """Create REST API"""
         try:
-            # Check if API exists
-            response = self.apigateway.get_rest_apis()
-            for api in response.get('items', []):
-                if api['name'] == api_name:
-                    logger.info(f"Using existing API: {api['id']}")
-                    return api['id']
-        except Exception as e:
+            # Check if API exists, stopping at the first match
+            paginator = self.apigateway.get_paginator('get_rest_apis')
+            for page in paginator.paginate(PaginationConfig={'PageSize': 500}):
+                for api in page.get('items', []):
+                    if api['name'] == api_name:
+                        logger.info(f"Using existing API: {api['id']}")
+                        return api['id']
+        except self.apigateway.exceptions.ClientError as e:
             logger.warning(f"Error checking existing APIs: {e}")
         
         # Create new API
@@ -156,7 +179,7 @@ class APIGatewaySetup:
             name=authorizer_name,
             type='COGNITO_USER_POOLS',
             providerARNs=[
-                f"arn:aws:cognito-idp:{self.region}:{self._get_account_id()}:userpool/{user_pool_id}"
+                f"arn:aws:cognito-idp:{self.region}:{_account_id()}:userpool/{user_pool_id}"
             ],
             identitySource='method.request.header.Authorization'
         )
@@ -217,6 +240,14 @@ class APIGatewaySetup:
         """Create API key for testing"""
         key_name = f"{config.name}-key-{config.environment}"
         
+        # Reuse an existing key; nameQuery is a prefix match, so compare names
+        paginator = self.apigateway.get_paginator('get_api_keys')
+        for page in paginator.paginate(nameQuery=key_name, includeValues=True):
+            for item in page.get('items', []):
+                if item['name'] == key_name:
+                    logger.info(f"Using existing API key: {item['id']}")
+                    return item['value']
+        
         response = self.apigateway.create_api_key(
             name=key_name,
             enabled=True
@@ -226,8 +257,7 @@ class APIGatewaySetup:
     
     def _get_account_id(self) -> str:
         """Get AWS account ID"""
-        sts = boto3.client('sts')
-        return sts.get_caller_identity()['Account']
+        return _account_id()
 
 
 def setup_api_gateway_with_cognito(config, lambda_arn: str):
@@ -3,22 +3,250 @@ Lambda function deployment
 Creates Lambda function for caching and proxy layer
 """
 
-import boto3
-import json
+import base64
+import hashlib
+import io
 import os
+import subprocess
+import sys
+import tempfile
 import zipfile
-from typing import Dict, Any
+from functools import cached_property
+from typing import Dict, Any, List, Tuple
 import logging
 
+from ._clients import client
+
 logger = logging.getLogger(__name__)
 
+# Packaged zip bytes keyed by sha256 of the handler code
+_PACKAGE_CACHE: Dict[str, bytes] = {}
+
+# Earliest timestamp the zip format can store
+_ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+
+# Handler dependencies vendored into the package, as wheels for the Lambda runtime
+_REQUIREMENTS_FILE = os.path.join(os.path.dirname(__file__), "lambda_requirements.txt")
+_LAMBDA_RUNTIME = "python3.11"
+_LAMBDA_PLATFORM = "manylinux2014_x86_64"
+
+# Lambda handler source, __MODEL_NAME__ is substituted per deploy
+_HANDLER_TEMPLATE = '''"""
+Lambda handler for __MODEL_NAME__
+Handles caching and SageMaker invocation
+"""
+
+import json
+import boto3
+import os
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from botocore.config import Config
+
+# orjson is much faster and produces bytes directly, fall back to stdlib
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+    def _dumps_sorted(obj):
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+except ImportError:
+    _loads = json.loads
+    def _dumps(obj):
+        return json.dumps(obj).encode()
+    def _dumps_sorted(obj):
+        return json.dumps(obj, sort_keys=True).encode()
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Initialize clients at module scope so they persist across warm invocations
+sagemaker_runtime = boto3.client(
+    'sagemaker-runtime',
+    config=Config(
+        retries={'mode': 'adaptive', 'max_attempts': 5},
+        tcp_keepalive=True,
+        max_pool_connections=50
+    )
+)
+cache_enabled = os.environ.get('CACHE_ENABLED', 'False') == 'True'
+cache_ttl = int(os.environ.get('CACHE_TTL', '3600'))
+redis_client = None
+
+# In-process LRU in front of Redis, survives across warm invocations
+_LOCAL = OrderedDict()
+_LOCAL_MAX = 256
+
+# Redis client initialization (if cache enabled)
+if cache_enabled:
+    try:
+        import redis
+        redis_endpoint = os.environ.get('REDIS_ENDPOINT')
+        if redis_endpoint:
+            redis_pool = redis.BlockingConnectionPool.from_url(
+                redis_endpoint, max_connections=50, timeout=2
+            )
+            redis_client = redis.Redis(connection_pool=redis_pool)
+    except ImportError:
+        cache_enabled = False
+        logger.warning("Redis not available, caching disabled")
+
+def lambda_handler(event, context):
+    """
+    Lambda handler function
+    Checks cache, invokes SageMaker endpoint, returns result
+    """
+    try:
+        # Parse request
+        body = _loads(event.get('body') or '{}')
+        endpoint_name = os.environ['SAGEMAKER_ENDPOINT']
+        
+        logger.info(f"Processing request for endpoint: {endpoint_name}")
+        
+        if isinstance(body, list):
+            result_json = _handle_batch(body, endpoint_name)
+        else:
+            result_json = _handle_single(body, endpoint_name)
+        
+        return {
+            'statusCode': 200,
+            'headers': {'Content-Type': 'application/json'},
+            'body': result_json.decode('utf-8')
+        }
+    
+    except Exception as e:
+        logger.error(f"Error: {str(e)}", exc_info=True)
+        return {
+            'statusCode': 500,
+            'headers': {'Content-Type': 'application/json'},
+            'body': json.dumps({'error': 'Internal server error'})
+        }
+
+def _handle_single(body, endpoint_name):
+    """Serve a single request from cache or SageMaker"""
+    # Check local cache, then Redis
+    if cache_enabled:
+        cache_key = _generate_cache_key(body)
+        cached_result = _local_get(cache_key)
+        
+        if cached_result is None and redis_client:
+            cached_result = redis_client.get(cache_key)
+            if cached_result:
+                _local_put(cache_key, cached_result)
+        
+        if cached_result:
+            logger.info("Cache hit!")
+            return cached_result
+    
+    logger.info("Cache miss, invoking SageMaker endpoint")
+    result_json = _invoke_endpoint(body, endpoint_name)
+    
+    # Store in cache
+    if cache_enabled:
+        _local_put(cache_key, result_json)
+        if redis_client:
+            redis_client.set(cache_key, result_json, ex=cache_ttl)
+        logger.info(f"Result cached with TTL: {cache_ttl}s")
+    
+    return result_json
+
+def _handle_batch(items, endpoint_name):
+    """Serve a list of requests, invoking SageMaker only for cache misses"""
+    use_cache = cache_enabled and items
+    
+    if use_cache:
+        cache_keys = [_generate_cache_key(item) for item in items]
+        results = [_local_get(key) for key in cache_keys]
+        
+        local_misses = [i for i, result in enumerate(results) if result is None]
+        if redis_client and local_misses:
+            fetched = redis_client.mget([cache_keys[i] for i in local_misses])
+            for i, result in zip(local_misses, fetched):
+                if result is not None:
+                    results[i] = result
+                    _local_put(cache_keys[i], result)
+    else:
+        results = [None] * len(items)
+    
+    misses = [i for i, result in enumerate(results) if result is None]
+    logger.info(f"Batch of {len(items)}: {len(items) - len(misses)} cache hits")
+    
+    for i in misses:
+        results[i] = _invoke_endpoint(items[i], endpoint_name)
+    
+    # Store misses, Redis in one round trip
+    if use_cache and misses:
+        for i in misses:
+            _local_put(cache_keys[i], results[i])
+        if redis_client:
+            pipe = redis_client.pipeline(transaction=False)
+            for i in misses:
+                pipe.set(cache_keys[i], results[i], ex=cache_ttl)
+            pipe.execute()
+        logger.info(f"{len(misses)} results cached with TTL: {cache_ttl}s")
+    
+    return b'[' + b','.join(results) + b']'
+
+def _local_get(key):
+    """Get a result from the in-process cache"""
+    entry = _LOCAL.get(key)
+    if entry is None:
+        return None
+    
+    expires_at, value = entry
+    if expires_at < time.monotonic():
+        del _LOCAL[key]
+        return None
+    
+    _LOCAL.move_to_end(key)
+    return value
+
+def _local_put(key, value):
+    """Store a result in the in-process cache, evicting the oldest entry"""
+    _LOCAL[key] = (time.monotonic() + cache_ttl, value)
+    _LOCAL.move_to_end(key)
+    if len(_LOCAL) > _LOCAL_MAX:
+        _LOCAL.popitem(last=False)
+
+def _invoke_endpoint(body, endpoint_name):
+    """Invoke SageMaker endpoint and return the JSON result as bytes"""
+    response = sagemaker_runtime.invoke_endpoint(
+        EndpointName=endpoint_name,
+        ContentType='application/json',
+        Body=_dumps(body)
+    )
+    
+    # Parse response
+    return _dumps(_loads(response['Body'].read()))
+
+def _generate_cache_key(data):
+    """Generate cache key from request data"""
+    # Not security sensitive, a 16-byte blake2b digest is plenty unique
+    return hashlib.blake2b(_dumps_sorted(data), digest_size=16).hexdigest()
+'''
+
 
 class LambdaDeployer:
     """Deploy Lambda function for model inference"""
     
+    _BASE_TAGS = {
+        'ManagedBy': 'CircleCI',
+        'Project': 'InsightEngine2.0'
+    }
+    
     def __init__(self, region: str = "eu-central-1"):
-        self.lambda_client = boto3.client('lambda', region_name=region)
         self.region = region
+        
+        self.execution_role = os.getenv("LAMBDA_EXECUTION_ROLE")
+        if not self.execution_role:
+            raise ValueError("LAMBDA_EXECUTION_ROLE environment variable not set")
+    
+    @cached_property
+    def lambda_client(self):
+        """Lambda client, created on first use"""
+        return client('lambda', self.region)
     
     def deploy_lambda_function(self, config, endpoint_name: str) -> Dict[str, Any]:
         """
@@ -36,59 +264,35 @@ class LambdaDeployer:
         logger.info(f"Deploying Lambda function: {function_name}")
         
         # Create Lambda package
-        lambda_zip = self._create_lambda_package(config, endpoint_name)
+        lambda_zip = self._create_lambda_package(config)
         
-        # Get execution role
-        execution_role = os.getenv("LAMBDA_EXECUTION_ROLE")
-        if not execution_role:
-            raise ValueError("LAMBDA_EXECUTION_ROLE environment variable not set")
+        environment = {
+            'SAGEMAKER_ENDPOINT': endpoint_name,
+            'CACHE_ENABLED': str(config.cache.enabled),
+            'CACHE_TTL': str(config.cache.ttl),
+            'MODEL_NAME': config.name
+        }
         
         # Deploy function
         try:
-            # Update existing function
-            response = self.lambda_client.update_function_code(
-                FunctionName=function_name,
-                ZipFile=lambda_zip
-            )
-            logger.info(f"Updated existing Lambda function: {function_name}")
-            
-            # Update configuration
-            self.lambda_client.update_function_configuration(
-                FunctionName=function_name,
-                Environment={
-                    'Variables': {
-                        'SAGEMAKER_ENDPOINT': endpoint_name,
-                        'CACHE_ENABLED': str(config.cache.enabled),
-                        'CACHE_TTL': str(config.cache.ttl),
-                        'MODEL_NAME': config.name
-                    }
-                }
-            )
-            
+            current = self.lambda_client.get_function(FunctionName=function_name)
         except self.lambda_client.exceptions.ResourceNotFoundException:
             # Create new function
             logger.info(f"Creating new Lambda function: {function_name}")
             response = self.lambda_client.create_function(
                 FunctionName=function_name,
-                Runtime='python3.11',
-                Role=execution_role,
+                Runtime=_LAMBDA_RUNTIME,
+                Role=self.execution_role,
                 Handler='lambda_handler.lambda_handler',
                 Code={'ZipFile': lambda_zip},
                 Timeout=900,  # 15 minutes
                 MemorySize=512,
-                Environment={
-                    'Variables': {
-                        'SAGEMAKER_ENDPOINT': endpoint_name,
-                        'CACHE_ENABLED': str(config.cache.enabled),
-                        'CACHE_TTL': str(config.cache.ttl),
-                        'MODEL_NAME': config.name
-                    }
-                },
-                Tags={
-                    'Environment': config.environment,
-                    'ManagedBy': 'CircleCI',
-                    'Project': 'InsightEngine2.0'
-                }
+                Environment={'Variables': environment},
+                Tags={**self._BASE_TAGS, 'Environment': config.environment}
+            )
+        else:
+            response = self._update_function(
+                function_name, current['Configuration'], lambda_zip, environment
             )
         
         logger.info(f"✅ Lambda function deployed: {function_name}")
@@ -99,127 +303,107 @@ class LambdaDeployer:
             "status": "Active"
         }
     
-    def _create_lambda_package(self, config, endpoint_name: str) -> bytes:
-        """Create Lambda deployment package"""
-        import tempfile
-        import shutil
+    def _update_function(self, function_name: str, current: Dict[str, Any],
+                         lambda_zip: bytes, environment: Dict[str, str]) -> Dict[str, Any]:
+        """Update existing function code and configuration, skipping what is unchanged"""
+        response = current
         
-        # Create temporary directory
-        temp_dir = tempfile.mkdtemp()
+        if current['CodeSha256'] == self._code_sha256(lambda_zip):
+            logger.info(f"Lambda code unchanged, skipping upload: {function_name}")
+        else:
+            response = self.lambda_client.update_function_code(
+                FunctionName=function_name,
+                ZipFile=lambda_zip
+            )
+            logger.info(f"Updated existing Lambda function: {function_name}")
         
-        try:
-            # Write Lambda handler
-            handler_code = self._generate_lambda_handler(config, endpoint_name)
-            handler_path = os.path.join(temp_dir, "lambda_handler.py")
-            
-            with open(handler_path, 'w') as f:
-                f.write(handler_code)
-            
-            # Create zip file
-            zip_path = os.path.join(temp_dir, "lambda.zip")
-            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                zipf.write(handler_path, "lambda_handler.py")
-            
-            # Read zip file
-            with open(zip_path, 'rb') as f:
-                return f.read()
+        if current.get('Environment', {}).get('Variables') == environment:
+            logger.info(f"Lambda configuration unchanged, skipping update: {function_name}")
+        else:
+            if response is not current:
+                # Configuration can't change while the code update is in progress
+                self.lambda_client.get_waiter('function_updated').wait(
+                    FunctionName=function_name
+                )
+            response = self.lambda_client.update_function_configuration(
+                FunctionName=function_name,
+                Environment={'Variables': environment}
+            )
         
-        finally:
-            shutil.rmtree(temp_dir)
+        return response
     
-    def _generate_lambda_handler(self, config, endpoint_name: str) -> str:
-        """Generate Lambda handler code"""
-        return f'''"""
-Lambda handler for {config.name}
-Handles caching and SageMaker invocation
-"""
-
-import json
-import boto3
-import os
-import hashlib
-import logging
-
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
-
-# Initialize clients
-sagemaker_runtime = boto3.client('sagemaker-runtime')
-cache_enabled = os.environ.get('CACHE_ENABLED', 'False') == 'True'
-
-# Redis client initialization (if cache enabled)
-if cache_enabled:
-    try:
-        import redis
-        redis_endpoint = os.environ.get('REDIS_ENDPOINT')
-        redis_client = redis.Redis.from_url(redis_endpoint) if redis_endpoint else None
-    except ImportError:
-        cache_enabled = False
-        redis_client = None
-        logger.warning("Redis not available, caching disabled")
-
-def lambda_handler(event, context):
-    """
-    Lambda handler function
-    Checks cache, invokes SageMaker endpoint, returns result
-    """
-    try:
-        # Parse request
-        body = json.loads(event.get('body', '{{}}'))
-        endpoint_name = os.environ['SAGEMAKER_ENDPOINT']
+    def _create_lambda_package(self, config) -> bytes:
+        """Create Lambda deployment package"""
+        handler_code = self._generate_lambda_handler(config)
+        with open(_REQUIREMENTS_FILE, 'rb') as f:
+            requirements = f.read()
         
-        logger.info(f"Processing request for endpoint: {{endpoint_name}}")
+        # Handler code and pinned requirements fully determine the package
+        # contents (only the model name is baked in, the endpoint is read from
+        # SAGEMAKER_ENDPOINT at runtime)
+        key = hashlib.sha256(handler_code.encode() + b"\0" + requirements).hexdigest()
+        if key in _PACKAGE_CACHE:
+            return _PACKAGE_CACHE[key]
         
-        # Check cache
-        if cache_enabled and redis_client:
-            cache_key = _generate_cache_key(body)
-            cached_result = redis_client.get(cache_key)
+        # Build zip in memory with a fixed timestamp and file order so identical
+        # inputs always produce identical bytes (and CodeSha256)
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED) as zipf:
+            self._write_zip_entry(zipf, "lambda_handler.py", handler_code.encode(), 0o755)
+            for name, data in self._vendor_dependencies():
+                self._write_zip_entry(zipf, name, data, 0o644)
+        
+        _PACKAGE_CACHE[key] = buf.getvalue()
+        return _PACKAGE_CACHE[key]
+    
+    @staticmethod
+    def _write_zip_entry(zipf: zipfile.ZipFile, name: str, data: bytes, mode: int):
+        """Add a file with the fixed zip timestamp"""
+        info = zipfile.ZipInfo(name, date_time=_ZIP_EPOCH)
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info.external_attr = mode << 16
+        zipf.writestr(info, data)
+    
+    @staticmethod
+    def _vendor_dependencies() -> List[Tuple[str, bytes]]:
+        """
+        Install lambda_requirements.txt as Lambda platform wheels, returning
+        (zip path, contents) for every installed file in sorted order
+        """
+        with tempfile.TemporaryDirectory() as target:
+            try:
+                subprocess.run(
+                    [sys.executable, "-m", "pip", "install", "--quiet", "--no-compile",
+                     "--platform", _LAMBDA_PLATFORM, "--implementation", "cp",
+                     "--python-version", _LAMBDA_RUNTIME.removeprefix("python"),
+                     "--only-binary=:all:", "--target", target, "-r", _REQUIREMENTS_FILE],
+                    check=True, capture_output=True
+                )
+            except (OSError, subprocess.CalledProcessError) as e:
+                stderr = getattr(e, 'stderr', None) or b''
+                logger.warning(
+                    f"Could not vendor {_REQUIREMENTS_FILE} into the Lambda package "
+                    f"({stderr.decode(errors='replace').strip() or e}): the handler "
+                    f"falls back to stdlib json and runs without the Redis cache"
+                )
+                return []
             
-            if cached_result:
-                logger.info("Cache hit!")
-                return {{
-                    'statusCode': 200,
-                    'headers': {{'Content-Type': 'application/json'}},
-                    'body': cached_result.decode('utf-8')
-                }}
-        
-        # Invoke SageMaker endpoint
-        logger.info("Cache miss, invoking SageMaker endpoint")
-        response = sagemaker_runtime.invoke_endpoint(
-            EndpointName=endpoint_name,
-            ContentType='application/json',
-            Body=json.dumps(body)
-        )
-        
-        # Parse response
-        result = json.loads(response['Body'].read())
-        result_json = json.dumps(result)
-        
-        # Store in cache
-        if cache_enabled and redis_client:
-            ttl = int(os.environ.get('CACHE_TTL', '3600'))
-            redis_client.setex(cache_key, ttl, result_json)
-            logger.info(f"Result cached with TTL: {{ttl}}s")
-        
-        return {{
-            'statusCode': 200,
-            'headers': {{'Content-Type': 'application/json'}},
-            'body': result_json
-        }}
+            files = []
+            for root, _, names in os.walk(target):
+                for name in names:
+                    path = os.path.join(root, name)
+                    with open(path, 'rb') as f:
+                        files.append((os.path.relpath(path, target).replace(os.sep, '/'), f.read()))
+            return sorted(files)
     
-    except Exception as e:
-        logger.error(f"Error: {{str(e)}}", exc_info=True)
-        return {{
-            'statusCode': 500,
-            'headers': {{'Content-Type': 'application/json'}},
-            'body': json.dumps({{'error': 'Internal server error'}})
-        }}
-
-def _generate_cache_key(data):
-    """Generate cache key from request data"""
-    data_str = json.dumps(data, sort_keys=True)
-    return hashlib.sha256(data_str.encode()).hexdigest()
-'''
+    @staticmethod
+    def _code_sha256(lambda_zip: bytes) -> str:
+        """Compute package hash in Lambda's CodeSha256 format"""
+        return base64.b64encode(hashlib.sha256(lambda_zip).digest()).decode()
+    
+    def _generate_lambda_handler(self, config) -> str:
+        """Generate Lambda handler code"""
+        return _HANDLER_TEMPLATE.replace('__MODEL_NAME__', config.name)
 
 
 def deploy_lambda_function(config, endpoint_name: str):
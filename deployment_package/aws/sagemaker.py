@@ -3,20 +3,48 @@ SageMaker deployment logic
 Handles model deployment to AWS SageMaker
 """
 
-import boto3
+import hashlib
+import os
 import time
-from typing import Dict, Any
+from functools import cached_property
+from typing import Dict, Any, List
 import logging
 
+from botocore.exceptions import WaiterError
+
+from ._clients import client
+
 logger = logging.getLogger(__name__)
 
 
 class SageMakerDeployer:
     """Deploy models to AWS SageMaker"""
     
+    _BASE_TAGS = [
+        {'Key': 'ManagedBy', 'Value': 'CircleCI'},
+        {'Key': 'Project', 'Value': 'InsightEngine2.0'}
+    ]
+    
     def __init__(self, region: str = "eu-central-1"):
-        self.sagemaker = boto3.client('sagemaker', region_name=region)
         self.region = region
+        
+        # Names of models/endpoint configs known to exist in this process
+        self._existing = set()
+        
+        # Deployment environment is fixed for the process, validate up front
+        self.ecr_registry = os.getenv("AWS_ECR_REGISTRY")
+        self.commit_sha = os.getenv("CIRCLE_SHA1", "latest")
+        self.execution_role = os.getenv("SAGEMAKER_EXECUTION_ROLE")
+        
+        if not self.ecr_registry:
+            raise ValueError("AWS_ECR_REGISTRY environment variable not set")
+        if not self.execution_role:
+            raise ValueError("SAGEMAKER_EXECUTION_ROLE environment variable not set")
+    
+    @cached_property
+    def sagemaker(self):
+        """SageMaker client, created on first use"""
+        return client('sagemaker', self.region)
     
     def deploy_sagemaker_endpoint(self, config) -> Dict[str, Any]:
         """
@@ -46,13 +74,15 @@ class SageMakerDeployer:
         # Create endpoint configuration
         endpoint_config_name = self._create_endpoint_config(
             model_name=model_name,
+            image_uri=ecr_image_uri,
             config=config
         )
         
         # Deploy endpoint
         endpoint_arn = self._deploy_endpoint(
             endpoint_name=endpoint_name,
-            endpoint_config_name=endpoint_config_name
+            endpoint_config_name=endpoint_config_name,
+            config=config
         )
         
         # Wait for endpoint to be in service
@@ -69,46 +99,72 @@ class SageMakerDeployer:
     
     def _get_ecr_image_uri(self, model_name: str) -> str:
         """Get ECR image URI from environment or construct it"""
-        import os
-        ecr_registry = os.getenv("AWS_ECR_REGISTRY")
-        commit_sha = os.getenv("CIRCLE_SHA1", "latest")
-        
-        if not ecr_registry:
-            raise ValueError("AWS_ECR_REGISTRY environment variable not set")
-        
-        return f"{ecr_registry}/{model_name}:{commit_sha}"
+        return f"{self.ecr_registry}/{model_name}:{self.commit_sha}"
+    
+    @staticmethod
+    def _container_environment(model_name: str, config) -> Dict[str, str]:
+        """Environment variables of the model container"""
+        return {
+            'MODEL_NAME': model_name,
+            'ENVIRONMENT': config.environment
+        }
     
     def _create_or_update_model(self, model_name: str, image_uri: str, config):
         """Create or update SageMaker model"""
-        import os
-        execution_role = os.getenv("SAGEMAKER_EXECUTION_ROLE")
+        if model_name in self._existing:
+            return
         
+        # Create optimistically, an existing model is not an error
         try:
-            self.sagemaker.describe_model(ModelName=model_name)
-            logger.info(f"Model {model_name} already exists, skipping creation")
-        except self.sagemaker.exceptions.ClientError:
             logger.info(f"Creating SageMaker model: {model_name}")
             self.sagemaker.create_model(
                 ModelName=model_name,
                 PrimaryContainer={
                     'Image': image_uri,
                     'Mode': 'SingleModel',
-                    'Environment': {
-                        'MODEL_NAME': model_name,
-                        'ENVIRONMENT': config.environment
-                    }
+                    'Environment': self._container_environment(model_name, config)
                 },
-                ExecutionRoleArn=execution_role,
-                Tags=[
-                    {'Key': 'Environment', 'Value': config.environment},
-                    {'Key': 'ManagedBy', 'Value': 'CircleCI'},
-                    {'Key': 'Project', 'Value': 'InsightEngine2.0'}
-                ]
+                ExecutionRoleArn=self.execution_role,
+                Tags=self._tags(config.environment)
             )
+        except self.sagemaker.exceptions.ClientError as e:
+            if not self._is_already_exists(e):
+                raise
+            logger.info(f"Model {model_name} already exists, skipping creation")
+            model_arn = self.sagemaker.describe_model(ModelName=model_name)['ModelArn']
+            self._sync_tags(model_arn, self._tags(config.environment))
+        
+        self._existing.add(model_name)
     
-    def _create_endpoint_config(self, model_name: str, config) -> str:
-        """Create endpoint configuration"""
-        endpoint_config_name = f"{model_name}-config-{int(time.time())}"
+    def _create_endpoint_config(self, model_name: str, image_uri: str, config) -> str:
+        """Create endpoint configuration, reusing an identical existing one"""
+        # Name is derived from everything that gets deployed, so an unchanged
+        # deployment maps onto the config it already has and any change
+        # (image, container environment, variant settings) rolls the endpoint
+        environment = sorted(self._container_environment(model_name, config).items())
+        material = f"{model_name}|{image_uri}|{environment}|{config.instance.type}|{config.instance.count}"
+        if self.commit_sha == "latest":
+            # A mutable tag can point at a new image under the same URI,
+            # always roll like a fresh deploy
+            material += f"|{time.time_ns()}"
+        key = hashlib.sha1(material.encode()).hexdigest()[:12]
+        endpoint_config_name = f"{model_name}-cfg-{key}"
+        
+        if endpoint_config_name in self._existing:
+            return endpoint_config_name
+        
+        try:
+            response = self.sagemaker.describe_endpoint_config(
+                EndpointConfigName=endpoint_config_name
+            )
+        except self.sagemaker.exceptions.ClientError as e:
+            if not self._is_not_found(e):
+                raise
+        else:
+            logger.info(f"Using existing endpoint configuration: {endpoint_config_name}")
+            self._sync_tags(response['EndpointConfigArn'], self._tags(config.environment))
+            self._existing.add(endpoint_config_name)
+            return endpoint_config_name
         
         logger.info(f"Creating endpoint configuration: {endpoint_config_name}")
         
@@ -123,62 +179,104 @@ class SageMakerDeployer:
                     'InitialVariantWeight': 1.0
                 }
             ],
-            Tags=[
-                {'Key': 'Environment', 'Value': config.environment},
-                {'Key': 'ManagedBy', 'Value': 'CircleCI'}
-            ]
+            Tags=self._tags(config.environment)
         )
         
         return endpoint_config_name
     
-    def _deploy_endpoint(self, endpoint_name: str, endpoint_config_name: str) -> str:
+    def _deploy_endpoint(self, endpoint_name: str, endpoint_config_name: str,
+                         config) -> str:
         """Deploy or update endpoint"""
-        try:
-            # Check if endpoint exists
-            response = self.sagemaker.describe_endpoint(EndpointName=endpoint_name)
+        # A config that existed before this deploy may already be live,
+        # a freshly created one cannot be
+        if endpoint_config_name in self._existing:
+            try:
+                response = self.sagemaker.describe_endpoint(EndpointName=endpoint_name)
+            except self.sagemaker.exceptions.ClientError as e:
+                if not self._is_not_found(e):
+                    raise
+                return self._create_endpoint(endpoint_name, endpoint_config_name, config)
             
-            # Update existing endpoint
-            logger.info(f"Updating existing endpoint: {endpoint_name}")
-            self.sagemaker.update_endpoint(
+            if response['EndpointConfigName'] == endpoint_config_name:
+                logger.info(f"Endpoint {endpoint_name} already uses {endpoint_config_name}, skipping update")
+                self._sync_tags(response['EndpointArn'], self._tags(config.environment))
+                return response['EndpointArn']
+        
+        # Update optimistically, redeploys are the common case
+        try:
+            response = self.sagemaker.update_endpoint(
                 EndpointName=endpoint_name,
                 EndpointConfigName=endpoint_config_name
             )
-            return response['EndpointArn']
-            
-        except self.sagemaker.exceptions.ClientError:
-            # Create new endpoint
-            logger.info(f"Creating new endpoint: {endpoint_name}")
-            response = self.sagemaker.create_endpoint(
-                EndpointName=endpoint_name,
-                EndpointConfigName=endpoint_config_name,
-                Tags=[
-                    {'Key': 'ManagedBy', 'Value': 'CircleCI'}
-                ]
-            )
-            return response['EndpointArn']
+        except self.sagemaker.exceptions.ClientError as e:
+            if not self._is_not_found(e):
+                raise
+            return self._create_endpoint(endpoint_name, endpoint_config_name, config)
+        
+        logger.info(f"Updating existing endpoint: {endpoint_name}")
+        self._existing.add(endpoint_config_name)
+        self._sync_tags(response['EndpointArn'], self._tags(config.environment))
+        return response['EndpointArn']
+    
+    def _create_endpoint(self, endpoint_name: str, endpoint_config_name: str,
+                         config) -> str:
+        """Create new endpoint"""
+        logger.info(f"Creating new endpoint: {endpoint_name}")
+        response = self.sagemaker.create_endpoint(
+            EndpointName=endpoint_name,
+            EndpointConfigName=endpoint_config_name,
+            Tags=self._tags(config.environment)
+        )
+        self._existing.add(endpoint_config_name)
+        return response['EndpointArn']
+    
+    @staticmethod
+    def _is_not_found(error) -> bool:
+        """Check if a ClientError means the resource does not exist"""
+        err = error.response.get('Error', {})
+        if err.get('Code') == 'ResourceNotFoundException':
+            return True
+        return err.get('Code') == 'ValidationException' and 'Could not find' in err.get('Message', '')
+    
+    @staticmethod
+    def _is_already_exists(error) -> bool:
+        """Check if a ClientError means the resource already exists"""
+        err = error.response.get('Error', {})
+        return err.get('Code') == 'ValidationException' and 'already existing' in err.get('Message', '')
+    
+    def _tags(self, environment: str) -> List[Dict[str, str]]:
+        """Tags applied to every SageMaker resource"""
+        return self._BASE_TAGS + [{'Key': 'Environment', 'Value': environment}]
+    
+    def _sync_tags(self, resource_arn: str, tags: List[Dict[str, str]]):
+        """Add tags missing from an existing resource"""
+        current = self.sagemaker.list_tags(ResourceArn=resource_arn).get('Tags', [])
+        missing = [tag for tag in tags if tag not in current]
+        if missing:
+            self.sagemaker.add_tags(ResourceArn=resource_arn, Tags=missing)
     
     def _wait_for_endpoint(self, endpoint_name: str, timeout: int = 900):
         """Wait for endpoint to be in service"""
         logger.info(f"Waiting for endpoint to be InService (timeout: {timeout}s)...")
         
-        start_time = time.time()
-        while True:
-            response = self.sagemaker.describe_endpoint(EndpointName=endpoint_name)
-            status = response['EndpointStatus']
-            
-            logger.info(f"Endpoint status: {status}")
-            
-            if status == 'InService':
-                logger.info("✅ Endpoint is InService")
-                return
-            elif status in ['Failed', 'RolledBack']:
-                raise RuntimeError(f"Endpoint deployment failed: {status}")
-            
-            elapsed = time.time() - start_time
-            if elapsed > timeout:
-                raise TimeoutError(f"Endpoint deployment timeout after {timeout}s")
-            
-            time.sleep(30)
+        waiter = self.sagemaker.get_waiter('endpoint_in_service')
+        try:
+            waiter.wait(
+                EndpointName=endpoint_name,
+                WaiterConfig={'Delay': 10, 'MaxAttempts': max(1, timeout // 10)}
+            )
+        except WaiterError as e:
+            last_response = e.last_response or {}
+            status = last_response.get('EndpointStatus')
+            if status in ['Failed', 'RolledBack']:
+                raise RuntimeError(f"Endpoint deployment failed: {status}") from e
+            if 'Error' in last_response:
+                raise RuntimeError(
+                    f"Endpoint deployment failed: {last_response['Error'].get('Message')}"
+                ) from e
+            raise TimeoutError(f"Endpoint deployment timeout after {timeout}s") from e
+        
+        logger.info("✅ Endpoint is InService")
 
 
 def deploy_sagemaker_endpoint(config):
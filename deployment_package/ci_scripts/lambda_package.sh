@@ -0,0 +1,9 @@
+#!/usr/bin/env bash
+# Build lambda.zip with the handler and its dependencies
+# Usage: lambda_package.sh
+set -eo pipefail
+
+mkdir -p lambda_package
+cp deployment_package/aws/lambda_handler.py lambda_package/
+pip install -r deployment_package/aws/lambda_requirements.txt -t lambda_package/
+cd lambda_package && zip -r ../lambda.zip . && cd ..
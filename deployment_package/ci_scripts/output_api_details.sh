@@ -0,0 +1,14 @@
+#!/usr/bin/env bash
+# Print the deployed API endpoint and key
+# Usage: output_api_details.sh <environment>
+set -eo pipefail
+
+ENVIRONMENT="$1"
+
+echo "========================================="
+echo "Deployment Complete!"
+echo "========================================="
+echo "API Endpoint: $API_ENDPOINT_URL"
+echo "API Key: $API_KEY"
+echo "Environment: ${ENVIRONMENT}"
+echo "========================================="
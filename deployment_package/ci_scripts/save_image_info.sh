@@ -0,0 +1,9 @@
+#!/usr/bin/env bash
+# Export the pushed ECR image URI for later steps
+# Usage: save_image_info.sh <model-name>
+set -eo pipefail
+
+MODEL_NAME="$1"
+
+echo "export ECR_IMAGE_URI=${AWS_ECR_REGISTRY}/${MODEL_NAME}:$CIRCLE_SHA1" >> $BASH_ENV
+echo "Image built: ${AWS_ECR_REGISTRY}/${MODEL_NAME}:$CIRCLE_SHA1"
@@ -3,8 +3,308 @@ CircleCI configuration generator
 Updates .circleci/config.yml based on user inputs
 """
 
-from typing import Dict, Any, Optional
-import yaml
+import copy
+import os
+import re
+from typing import Dict, Any, Optional, Union
+
+from config import UserInputs, dump_yaml, is_plain_scalar, write_atomic
+
+# Placeholder for the model name in the config skeleton
+_MODEL_NAME = "__MODEL_NAME__"
+
+# Placeholders for the parameters substituted into the pre-rendered config
+_SENTINELS = {
+    "model_name": _MODEL_NAME,
+    "instance_type": "__INSTANCE_TYPE__",
+    "instance_count": "__INSTANCE_COUNT__",
+    "aws_region": "__REGION__",
+    "environment": "__ENV__"
+}
+_SENTINEL_PATTERN = re.compile(b"|".join(re.escape(s.encode()) for s in _SENTINELS.values()))
+
+# Job step commands, the scripts live in deployment_package/ci_scripts
+_SAVE_IMAGE_INFO_COMMAND = "bash deployment_package/ci_scripts/save_image_info.sh << pipeline.parameters.model-name >>"
+_LAMBDA_PACKAGE_COMMAND = "bash deployment_package/ci_scripts/lambda_package.sh"
+_OUTPUT_API_DETAILS_COMMAND = "bash deployment_package/ci_scripts/output_api_details.sh << pipeline.parameters.environment >>"
+
+# Shared by every job, emitted once as a YAML anchor and then aliased
+_DOCKER_PY311 = [{"image": "cimg/python:3.11"}]
+_AWS_SETUP = {
+    "aws-cli/setup": {
+        "role_arn": "$AWS_ROLE_ARN",
+        "region": "$AWS_REGION"
+    }
+}
+
+# pip wheel cache, one entry per job and requirements file contents
+_PIP_CACHE_KEY = 'v1-pip-{{ .Environment.CIRCLE_JOB }}-{{ checksum "<< parameters.requirements >>" }}'
+
+_CONFIG_TEMPLATE = {
+    "version": 2.1,
+    "orbs": {
+        "aws-cli": "circleci/aws-cli@4.1.0",
+        "aws-ecr": "circleci/aws-ecr@9.0.0",
+        "sonarcloud": "sonarsource/sonarcloud@2.0.0"
+    },
+    "parameters": {
+        "model-name": {
+            "type": "string",
+            "default": _MODEL_NAME
+        },
+        "instance-type": {
+            "type": "string",
+            "default": "ml.m5.xlarge"
+        },
+        "instance-count": {
+            "type": "integer",
+            "default": 1
+        },
+        "aws-region": {
+            "type": "string",
+            "default": "eu-central-1"
+        },
+        "environment": {
+            "type": "string",
+            "default": "dev"
+        }
+    },
+    "commands": {
+        "python-install-cached": {
+            "description": "Run a pip install step with the pip cache restored and saved",
+            "parameters": {
+                "requirements": {
+                    "type": "string",
+                    "default": "requirements.txt"
+                },
+                "step-name": {
+                    "type": "string",
+                    "default": "Install Python packages"
+                },
+                "command": {
+                    "type": "string",
+                    "default": "pip install -r requirements.txt"
+                }
+            },
+            "steps": [
+                {
+                    "restore_cache": {
+                        "keys": [_PIP_CACHE_KEY]
+                    }
+                },
+                {
+                    "run": {
+                        "name": "<< parameters.step-name >>",
+                        "command": "<< parameters.command >>"
+                    }
+                },
+                {
+                    "save_cache": {
+                        "key": _PIP_CACHE_KEY,
+                        "paths": ["~/.cache/pip"]
+                    }
+                }
+            ]
+        }
+    },
+    "jobs": {
+        "code-quality-scan": {
+            "docker": _DOCKER_PY311,
+            "steps": [
+                "checkout",
+                "python-install-cached",
+                {
+                    "run": {
+                        "name": "Run tests",
+                        "command": "pytest tests/ -v --cov=src --cov-report=xml"
+                    }
+                },
+                {
+                    "sonarcloud/scan": {
+                        "sonar_token_variable_name": "SONAR_TOKEN"
+                    }
+                }
+            ]
+        },
+        "build-and-push-image": {
+            "docker": _DOCKER_PY311,
+            "steps": [
+                "checkout",
+                {
+                    "setup_remote_docker": {
+                        "docker_layer_caching": True
+                    }
+                },
+                {
+                    "aws-ecr/build-and-push-image": {
+                        "repo": "${AWS_ECR_REGISTRY}/" + _MODEL_NAME,
+                        "tag": "$CIRCLE_SHA1,latest",
+                        "region": "$AWS_REGION",
+                        "extra-build-args": "--build-arg FURY_TOKEN=$FURY_TOKEN"
+                    }
+                },
+                {
+                    "run": {
+                        "name": "Save image info",
+                        "command": _SAVE_IMAGE_INFO_COMMAND
+                    }
+                }
+            ]
+        },
+        "deploy-sagemaker": {
+            "docker": _DOCKER_PY311,
+            "steps": [
+                "checkout",
+                _AWS_SETUP,
+                {
+                    "python-install-cached": {
+                        "step-name": "Install deployment dependencies",
+                        "command": "pip install boto3 pyyaml"
+                    }
+                },
+                {
+                    "run": {
+                        "name": "Deploy to SageMaker",
+                        "command": "python deployment_package/deploy.py --environment << pipeline.parameters.environment >>"
+                    }
+                }
+            ]
+        },
+        "deploy-lambda": {
+            "docker": _DOCKER_PY311,
+            "steps": [
+                "checkout",
+                _AWS_SETUP,
+                {
+                    "python-install-cached": {
+                        "requirements": "deployment_package/aws/lambda_requirements.txt",
+                        "step-name": "Create Lambda package",
+                        "command": _LAMBDA_PACKAGE_COMMAND
+                    }
+                },
+                {
+                    "run": {
+                        "name": "Deploy Lambda function",
+                        "command": "python deployment_package/aws/lambda.py"
+                    }
+                }
+            ]
+        },
+        "setup-api-gateway": {
+            "docker": _DOCKER_PY311,
+            "steps": [
+                "checkout",
+                _AWS_SETUP,
+                {
+                    "run": {
+                        "name": "Setup API Gateway (Dev)",
+                        "command": "python deployment_package/aws/apigateway.py"
+                    }
+                },
+                {
+                    "run": {
+                        "name": "Output API details",
+                        "command": _OUTPUT_API_DETAILS_COMMAND
+                    }
+                }
+            ]
+        },
+        "setup-apigeex": {
+            "docker": _DOCKER_PY311,
+            "steps": [
+                "checkout",
+                {
+                    "run": {
+                        "name": "Setup ApigeeX Proxy",
+                        "command": "python deployment_package/apigeex/proxy.py"
+                    }
+                }
+            ]
+        }
+    },
+    "workflows": {
+        "build-test-deploy": {
+            "jobs": [
+                "code-quality-scan",
+                {
+                    "build-and-push-image": {
+                        "requires": ["code-quality-scan"],
+                        "context": ["aws-credentials", "docker-hub"]
+                    }
+                },
+                {
+                    "approve-dev-deploy": {
+                        "type": "approval",
+                        "requires": ["build-and-push-image"],
+                        "filters": {
+                            "branches": {
+                                "only": ["main", "develop"]
+                            }
+                        }
+                    }
+                },
+                {
+                    "deploy-sagemaker": {
+                        "requires": ["approve-dev-deploy"],
+                        "context": ["aws-credentials"]
+                    }
+                },
+                {
+                    "deploy-lambda": {
+                        "requires": ["deploy-sagemaker"],
+                        "context": ["aws-credentials"]
+                    }
+                }
+            ]
+        }
+    }
+}
+
+
+def _with_workflow_jobs(template: Dict[str, Any], *jobs: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of template with extra jobs appended to the workflow"""
+    config = copy.deepcopy(template)
+    config["workflows"]["build-test-deploy"]["jobs"].extend(jobs)
+    return config
+
+
+# Add API Gateway for dev, ApigeeX for stage/prod
+_CONFIG_TEMPLATES = {
+    "dev": _with_workflow_jobs(_CONFIG_TEMPLATE, {
+        "setup-api-gateway": {
+            "requires": ["deploy-lambda"],
+            "context": ["aws-credentials"]
+        }
+    }),
+    "default": _with_workflow_jobs(_CONFIG_TEMPLATE, {
+        "setup-apigeex": {
+            "requires": ["deploy-lambda"],
+            "context": ["gcp-credentials"]
+        }
+    })
+}
+
+
+def _render_template(node: Any, model_name: str, memo: Optional[Dict[int, Any]] = None) -> Any:
+    """Copy a template node, substituting the model name placeholder
+
+    Nodes shared within the template stay shared in the copy, so they are
+    still emitted as YAML anchors/aliases.
+    """
+    if memo is None:
+        memo = {}
+    if isinstance(node, str):
+        return node.replace(_MODEL_NAME, model_name) if _MODEL_NAME in node else node
+    if not isinstance(node, (dict, list)):
+        return node
+    
+    if id(node) not in memo:
+        if isinstance(node, dict):
+            memo[id(node)] = {key: _render_template(value, model_name, memo) for key, value in node.items()}
+        else:
+            memo[id(node)] = [_render_template(value, model_name, memo) for value in node]
+    return memo[id(node)]
+
 
 class CircleCIGenerator:
     """Generate and update CircleCI configuration"""
@@ -31,283 +331,151 @@ class CircleCIGenerator:
             environment: Deployment environment
         """
         
-        config = {
-            "version": 2.1,
-            "orbs": {
-                "aws-cli": "circleci/aws-cli@4.1.0",
-                "aws-ecr": "circleci/aws-ecr@9.0.0",
-                "sonarcloud": "sonarsource/sonarcloud@2.0.0",
-                "python": "circleci/python@2.1.1"
-            },
-            "parameters": {
-                "model-name": {
-                    "type": "string",
-                    "default": self.model_name
-                },
-                "instance-type": {
-                    "type": "string",
-                    "default": instance_type
-                },
-                "instance-count": {
-                    "type": "integer",
-                    "default": instance_count
-                },
-                "aws-region": {
-                    "type": "string",
-                    "default": aws_region
-                },
-                "environment": {
-                    "type": "string",
-                    "default": environment
-                }
-            },
-            "jobs": {
-                "code-quality-scan": {
-                    "docker": [{"image": "cimg/python:3.11"}],
-                    "steps": [
-                        "checkout",
-                        {
-                            "python/install-packages": {
-                                "pkg-manager": "pip"
-                            }
-                        },
-                        {
-                            "run": {
-                                "name": "Run tests",
-                                "command": "pytest tests/ -v --cov=src --cov-report=xml"
-                            }
-                        },
-                        {
-                            "sonarcloud/scan": {
-                                "sonar_token_variable_name": "SONAR_TOKEN"
-                            }
-                        }
-                    ]
-                },
-                "build-and-push-image": {
-                    "docker": [{"image": "cimg/python:3.11"}],
-                    "steps": [
-                        "checkout",
-                        "setup_remote_docker",
-                        {
-                            "aws-ecr/build-and-push-image": {
-                                "repo": f"${{AWS_ECR_REGISTRY}}/{self.model_name}",
-                                "tag": "$CIRCLE_SHA1,latest",
-                                "region": "$AWS_REGION",
-                                "extra-build-args": "--build-arg FURY_TOKEN=$FURY_TOKEN"
-                            }
-                        },
-                        {
-                            "run": {
-                                "name": "Save image info",
-                                "command": f'''
-echo "export ECR_IMAGE_URI=${{AWS_ECR_REGISTRY}}/{self.model_name}:$CIRCLE_SHA1" >> $BASH_ENV
-echo "Image built: ${{AWS_ECR_REGISTRY}}/{self.model_name}:$CIRCLE_SHA1"
-'''
-                            }
-                        }
-                    ]
-                },
-                "deploy-sagemaker": {
-                    "docker": [{"image": "cimg/python:3.11"}],
-                    "steps": [
-                        "checkout",
-                        {
-                            "aws-cli/setup": {
-                                "role_arn": "$AWS_ROLE_ARN",
-                                "region": "$AWS_REGION"
-                            }
-                        },
-                        {
-                            "run": {
-                                "name": "Install deployment dependencies",
-                                "command": "pip install boto3 pyyaml"
-                            }
-                        },
-                        {
-                            "run": {
-                                "name": "Deploy to SageMaker",
-                                "command": f"python deployment_package/deploy.py --environment << pipeline.parameters.environment >>"
-                            }
-                        }
-                    ]
-                },
-                "deploy-lambda": {
-                    "docker": [{"image": "cimg/python:3.11"}],
-                    "steps": [
-                        "checkout",
-                        {
-                            "aws-cli/setup": {
-                                "role_arn": "$AWS_ROLE_ARN",
-                                "region": "$AWS_REGION"
-                            }
-                        },
-                        {
-                            "run": {
-                                "name": "Create Lambda package",
-                                "command": '''
-mkdir -p lambda_package
-cp deployment_package/aws/lambda_handler.py lambda_package/
-pip install -r deployment_package/aws/lambda_requirements.txt -t lambda_package/
-cd lambda_package && zip -r ../lambda.zip . && cd ..
-'''
-                            }
-                        },
-                        {
-                            "run": {
-                                "name": "Deploy Lambda function",
-                                "command": "python deployment_package/aws/lambda.py"
-                            }
-                        }
-                    ]
-                },
-                "setup-api-gateway": {
-                    "docker": [{"image": "cimg/python:3.11"}],
-                    "steps": [
-                        "checkout",
-                        {
-                            "aws-cli/setup": {
-                                "role_arn": "$AWS_ROLE_ARN",
-                                "region": "$AWS_REGION"
-                            }
-                        },
-                        {
-                            "run": {
-                                "name": "Setup API Gateway (Dev)",
-                                "command": "python deployment_package/aws/apigateway.py"
-                            }
-                        },
-                        {
-                            "run": {
-                                "name": "Output API details",
-                                "command": '''
-echo "========================================="
-echo "Deployment Complete!"
-echo "========================================="
-echo "API Endpoint: $API_ENDPOINT_URL"
-echo "API Key: $API_KEY"
-echo "Environment: << pipeline.parameters.environment >>"
-echo "========================================="
-'''
-                            }
-                        }
-                    ]
-                },
-                "setup-apigeex": {
-                    "docker": [{"image": "cimg/python:3.11"}],
-                    "steps": [
-                        "checkout",
-                        {
-                            "run": {
-                                "name": "Setup ApigeeX Proxy",
-                                "command": "python deployment_package/apigeex/proxy.py"
-                            }
-                        }
-                    ]
-                }
-            },
-            "workflows": {
-                "build-test-deploy": {
-                    "jobs": [
-                        "code-quality-scan",
-                        {
-                            "build-and-push-image": {
-                                "requires": ["code-quality-scan"],
-                                "context": ["aws-credentials", "docker-hub"]
-                            }
-                        },
-                        {
-                            "approve-dev-deploy": {
-                                "type": "approval",
-                                "requires": ["build-and-push-image"],
-                                "filters": {
-                                    "branches": {
-                                        "only": ["main", "develop"]
-                                    }
-                                }
-                            }
-                        },
-                        {
-                            "deploy-sagemaker": {
-                                "requires": ["approve-dev-deploy"],
-                                "context": ["aws-credentials"]
-                            }
-                        },
-                        {
-                            "deploy-lambda": {
-                                "requires": ["deploy-sagemaker"],
-                                "context": ["aws-credentials"]
-                            }
-                        }
-                    ]
-                }
-            }
-        }
+        # Copy the prebuilt skeleton for this environment, substituting the
+        # model name, then fill in the remaining parameters
+        config = _render_template(
+            _CONFIG_TEMPLATES["dev" if environment == "dev" else "default"],
+            self.model_name
+        )
         
-        # Add API Gateway for dev, ApigeeX for stage/prod
-        if environment == "dev":
-            config["workflows"]["build-test-deploy"]["jobs"].append({
-                "setup-api-gateway": {
-                    "requires": ["deploy-lambda"],
-                    "context": ["aws-credentials"]
-                }
-            })
-        else:
-            config["workflows"]["build-test-deploy"]["jobs"].append({
-                "setup-apigeex": {
-                    "requires": ["deploy-lambda"],
-                    "context": ["gcp-credentials"]
-                }
-            })
+        parameters = config["parameters"]
+        parameters["instance-type"]["default"] = instance_type
+        parameters["instance-count"]["default"] = instance_count
+        parameters["aws-region"]["default"] = aws_region
+        parameters["environment"]["default"] = environment
         
         return config
     
-    def save_config(self, config: Dict[str, Any], output_path: str = ".circleci/config.yml"):
+    def render_config(self,
+                      instance_type: str = "ml.m5.xlarge",
+                      instance_count: int = 1,
+                      enable_autoscaling: bool = False,
+                      enable_cache: bool = True,
+                      aws_region: str = "eu-central-1",
+                      environment: str = "dev") -> bytes:
+        """
+        Render CircleCI config.yml contents, same arguments as generate_config
+        
+        Substitutes the parameters into the YAML pre-rendered at import. Falls
+        back to generate_config + dump when a value would not be emitted as a
+        plain scalar.
+        """
+        values = {
+            "model_name": self.model_name,
+            "instance_type": instance_type,
+            "instance_count": instance_count,
+            "aws_region": aws_region,
+            "environment": environment
+        }
+        
+        if not all(map(_substitutable, values.values())):
+            return _dump_bytes(self.generate_config(
+                instance_type=instance_type,
+                instance_count=instance_count,
+                enable_autoscaling=enable_autoscaling,
+                enable_cache=enable_cache,
+                aws_region=aws_region,
+                environment=environment
+            ))
+        
+        replacements = {_SENTINELS[name].encode(): str(value).encode() for name, value in values.items()}
+        template = _YAML_TEMPLATES["dev" if environment == "dev" else "default"]
+        return _SENTINEL_PATTERN.sub(lambda match: replacements[match.group()], template)
+    
+    def save_config(self, config: Dict[str, Any], output_path: Union[str, os.PathLike] = ".circleci/config.yml"):
         """Save CircleCI configuration to file"""
-        with open(output_path, 'w') as f:
-            yaml.dump(config, f, default_flow_style=False, sort_keys=False)
+        self.write_config(_dump_bytes(config), output_path)
+    
+    def write_config(self, data: bytes, output_path: Union[str, os.PathLike] = ".circleci/config.yml"):
+        """Write rendered CircleCI configuration to file"""
+        write_atomic(output_path, data)
         print(f"✅ CircleCI config saved to {output_path}")
     
-    def update_config_from_user_input(self, user_config: Dict[str, Any]) -> Dict[str, Any]:
+    def update_config_from_user_input(self, user_config: UserInputs) -> Dict[str, Any]:
         """
         Update CircleCI config based on user input
         
         Args:
-            user_config: Dictionary with user configuration
-                {
-                    "model_name": str,
-                    "instance_type": str,
-                    "instance_count": int,
-                    "enable_autoscaling": bool,
-                    "min_instances": int,
-                    "max_instances": int,
-                    "enable_cache": bool,
-                    "cache_ttl": int,
-                    "aws_region": str,
-                    "environment": str
-                }
+            user_config: Collected user inputs (instance type/count, auto-scaling,
+                cache, AWS region and environment are used)
         """
-        return self.generate_config(
-            instance_type=user_config.get("instance_type", "ml.m5.xlarge"),
-            instance_count=user_config.get("instance_count", 1),
-            enable_autoscaling=user_config.get("enable_autoscaling", False),
-            enable_cache=user_config.get("enable_cache", True),
-            aws_region=user_config.get("aws_region", "eu-central-1"),
-            environment=user_config.get("environment", "dev")
-        )
+        return self.generate_config(**_user_parameters(user_config))
 
 
-def generate_circleci_config(model_name: str, user_config: Dict[str, Any], 
-                            output_path: str = ".circleci/config.yml"):
+def _user_parameters(user_config: UserInputs) -> Dict[str, Any]:
+    """generate_config/render_config arguments from user configuration"""
+    return {
+        "instance_type": user_config.instance_type,
+        "instance_count": user_config.instance_count,
+        "enable_autoscaling": user_config.enable_autoscaling,
+        "enable_cache": user_config.enable_cache,
+        "aws_region": user_config.aws_region,
+        "environment": user_config.environment
+    }
+
+
+def _substitutable(value: Any) -> bool:
+    """Whether value renders identically when substituted for a sentinel"""
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, int):
+        return True
+    return isinstance(value, str) and is_plain_scalar(value)
+
+
+def _dump_bytes(config: Dict[str, Any]) -> bytes:
+    """Emit config as YAML bytes"""
+    return dump_yaml(config).encode()
+
+
+def _prerender(environment: str) -> bytes:
+    """YAML for the environment's skeleton with sentinel parameters"""
+    config = CircleCIGenerator(_MODEL_NAME).generate_config(
+        instance_type=_SENTINELS["instance_type"],
+        instance_count=_SENTINELS["instance_count"],
+        aws_region=_SENTINELS["aws_region"],
+        environment=environment
+    )
+    config["parameters"]["environment"]["default"] = _SENTINELS["environment"]
+    return _dump_bytes(config)
+
+
+# Pre-rendered config.yml for dev and for stage/prod
+_YAML_TEMPLATES = {
+    "dev": _prerender("dev"),
+    "default": _prerender("prod")
+}
+
+
+def generate_circleci_config(model_name: str, user_config: UserInputs, 
+                            output_path: Union[str, os.PathLike] = ".circleci/config.yml") -> Dict[str, Any]:
     """
     Generate CircleCI configuration from user inputs
+    Writes config.yml and returns the config as a dictionary (use
+    write_circleci_config when only the file is needed)
     
     Args:
         model_name: Name of the model
-        user_config: User configuration dictionary
+        user_config: Collected user inputs
+        output_path: Output path for config file
+    """
+    write_circleci_config(model_name, user_config, output_path)
+    return CircleCIGenerator(model_name).update_config_from_user_input(user_config)
+
+
+def write_circleci_config(model_name: str, user_config: UserInputs,
+                          output_path: Union[str, os.PathLike] = ".circleci/config.yml") -> bytes:
+    """
+    Render config.yml from user inputs and write it, without building the
+    config dictionary
+    Returns the bytes written
+    
+    Args:
+        model_name: Name of the model
+        user_config: Collected user inputs
         output_path: Output path for config file
     """
     generator = CircleCIGenerator(model_name)
-    config = generator.update_config_from_user_input(user_config)
-    generator.save_config(config, output_path)
-    return config
+    data = generator.render_config(**_user_parameters(user_config))
+    generator.write_config(data, output_path)
+    return data
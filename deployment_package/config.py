@@ -3,27 +3,52 @@ Configuration management for deployment package.
 Handles environment variables and deployment flags.
 """
 
+import functools
+import mmap
 import os
+import re
 import yaml
-from typing import Dict, Any, Optional
-from dataclasses import dataclass
+from typing import Dict, Any, Literal, Optional, Tuple, Union
+from dataclasses import dataclass, field, fields, asdict
 
-@dataclass
+# Prefer the LibYAML C extension, fall back to the pure-Python implementation
+try:
+    from yaml import CSafeDumper as _Dumper, CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeDumper as _Dumper, SafeLoader as _Loader
+
+# Dataclass field names that are spelled differently in release.yaml
+_YAML_KEYS = {
+    'volume_size_gb': 'volumeSizeInGB',
+    'min_instances': 'minInstances',
+    'max_instances': 'maxInstances',
+    'target_invocations_per_instance': 'targetInvocationsPerInstance',
+    'deploy_timeout': 'deployTimeout'
+}
+_FIELD_NAMES = {yaml_key: field for field, yaml_key in _YAML_KEYS.items()}
+
+# Emitter line width that never folds (LibYAML needs a C int, not float("inf"))
+_NO_WRAP = 2 ** 31 - 1
+
+_RESOLVER = yaml.resolver.Resolver()
+_PLAIN_SCALAR = re.compile(r"[\w/$][\w./$@=,+<> -]*(?<! )")
+
+@dataclass(slots=True, frozen=True)
 class InstanceConfig:
     """SageMaker instance configuration"""
     type: str = "ml.m5.xlarge"
     count: int = 1
     volume_size_gb: int = 50
     region: str = "eu-central-1"
-    tags: Dict[str, str] = None
+    tags: Dict[str, str] = field(default_factory=dict)
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CacheConfig:
     """Redis/Valkey cache configuration"""
     enabled: bool = True
     ttl: int = 3600
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AutoScalingConfig:
     """Auto-scaling configuration"""
     enabled: bool = False
@@ -31,81 +56,134 @@ class AutoScalingConfig:
     max_instances: int = 4
     target_invocations_per_instance: int = 100
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class DeploymentConfig:
     """Main deployment configuration"""
     name: str
     type: str = "sagemaker"
-    version: Dict[str, int] = None
-    instance: InstanceConfig = None
-    cache: CacheConfig = None
-    autoscaling: AutoScalingConfig = None
+    version: Dict[str, int] = field(default_factory=lambda: {"major": 1, "minor": 0})
+    instance: InstanceConfig = field(default_factory=InstanceConfig)
+    cache: CacheConfig = field(default_factory=CacheConfig)
+    autoscaling: AutoScalingConfig = field(default_factory=AutoScalingConfig)
     deploy_timeout: int = 900
     environment: str = "dev"
+
+@dataclass(slots=True, frozen=True)
+class UserInputs:
+    """Answers collected by `init`, interactively or from a config file"""
+    model_name: str
+    environment: Literal["dev", "qa", "staging", "prod"] = "dev"
+    instance_type: str = "ml.m5.xlarge"
+    instance_count: int = 1
+    enable_autoscaling: bool = False
+    min_instances: int = 1
+    max_instances: int = 4
+    target_invocations: int = 100
+    enable_cache: bool = True
+    cache_ttl: int = 3600
+    aws_region: str = "eu-central-1"
+    team_name: str = "ml-team"
+    volume_size: int = 50
+    features: Tuple[str, ...] = ()
     
     def __post_init__(self):
-        if self.instance is None:
-            self.instance = InstanceConfig()
-        if self.cache is None:
-            self.cache = CacheConfig()
-        if self.autoscaling is None:
-            self.autoscaling = AutoScalingConfig()
-        if self.version is None:
-            self.version = {"major": 1, "minor": 0}
+        if self.environment not in ("dev", "qa", "staging", "prod"):
+            raise ValueError(f"Unknown environment: {self.environment!r}")
+    
+    @classmethod
+    def from_mapping(cls, data: Dict[str, Any]) -> "UserInputs":
+        """Build from a parsed mapping, rejecting unknown keys"""
+        unknown = set(data) - {f.name for f in fields(cls)}
+        if unknown:
+            raise ValueError(f"Unknown configuration keys: {', '.join(sorted(unknown))}")
+        if "features" in data:
+            data = {**data, "features": tuple(data["features"] or ())}
+        return cls(**data)
+
+def dump_yaml(data: Any, stream=None) -> Optional[str]:
+    """
+    Dump data as block-style YAML, preserving key order
+    
+    Returns the document when stream is None, otherwise writes it to stream
+    in a single call.
+    """
+    # Raw UTF-8 instead of escapes, and no line folding so output doesn't
+    # depend on scalar lengths
+    text = yaml.dump(data, Dumper=_Dumper, default_flow_style=False, sort_keys=False,
+                     allow_unicode=True, width=_NO_WRAP)
+    
+    if stream is None:
+        return text
+    stream.write(text)
+    return None
+
+def write_atomic(path: Union[str, os.PathLike], data: bytes):
+    """Write data to path with one write, replacing any existing file atomically"""
+    tmp_path = f"{os.fspath(path)}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def load_yaml(data: Any) -> Any:
+    """Parse YAML (or JSON) from a str, bytes or binary stream"""
+    return yaml.load(data, Loader=_Loader)
+
+def is_plain_scalar(text: str) -> bool:
+    """Whether text is emitted unquoted and reads back as the same string"""
+    resolved = _RESOLVER.resolve(yaml.nodes.ScalarNode, text, (True, False))
+    return resolved == _RESOLVER.DEFAULT_SCALAR_TAG and _PLAIN_SCALAR.fullmatch(text) is not None
 
+@functools.lru_cache(maxsize=None)
 def get_env(var: str, default: Optional[str] = None) -> Optional[str]:
-    """Get environment variable"""
+    """Get environment variable (memoized, call get_env.cache_clear() after changing os.environ)"""
     return os.getenv(var, default)
 
-def load_release_config(config_path: str = "release.yaml") -> DeploymentConfig:
+def load_release_config(config_path: Union[str, os.PathLike] = "release.yaml") -> DeploymentConfig:
     """Load configuration from release.yaml"""
-    with open(config_path, 'r') as f:
-        config_data = yaml.safe_load(f)
+    # Hand the mapped bytes straight to the parser, no decoded str copy
+    with open(config_path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            config_data = yaml.load(mm, Loader=_Loader)
+        finally:
+            mm.close()
     
     return DeploymentConfig(
         name=config_data.get('name'),
         type=config_data.get('type', 'sagemaker'),
         version=config_data.get('version', {"major": 1, "minor": 0}),
-        instance=InstanceConfig(**config_data.get('instance', {})),
+        instance=InstanceConfig(**_from_yaml_keys(config_data.get('instance', {}))),
         cache=CacheConfig(**config_data.get('cache', {})),
-        autoscaling=AutoScalingConfig(**config_data.get('autoscaling', {})),
+        autoscaling=AutoScalingConfig(**_from_yaml_keys(config_data.get('autoscaling', {}))),
         deploy_timeout=config_data.get('deployTimeout', 900),
         environment=get_env('ENVIRONMENT', 'dev')
     )
 
-def save_release_config(config: DeploymentConfig, config_path: str = "release.yaml"):
+def save_release_config(config: DeploymentConfig, config_path: Union[str, os.PathLike] = "release.yaml"):
     """Save configuration to release.yaml"""
-    config_dict = {
-        'name': config.name,
-        'type': config.type,
-        'version': config.version,
-        'instance': {
-            'type': config.instance.type,
-            'count': config.instance.count,
-            'volumeSizeInGB': config.instance.volume_size_gb,
-            'region': config.instance.region,
-            'tags': config.instance.tags or {}
-        },
-        'cache': {
-            'enabled': config.cache.enabled,
-            'ttl': config.cache.ttl
-        },
-        'autoscaling': {
-            'enabled': config.autoscaling.enabled,
-            'minInstances': config.autoscaling.min_instances,
-            'maxInstances': config.autoscaling.max_instances,
-            'targetInvocationsPerInstance': config.autoscaling.target_invocations_per_instance
-        },
-        'deployTimeout': config.deploy_timeout,
-        'sagemaker': {
-            'bucket': 'insights-engine-sagemaker-models',
-            'model_name': config.name,
-            'endpoint_name': f"{config.name}-endpoint",
-            'model_desc': f"{config.name} ML model",
-            'instance_type': config.instance.type,
-            'instance_count': config.instance.count
-        }
+    config_dict = asdict(config)
+    del config_dict['environment']
+    
+    config_dict['instance']['tags'] = config_dict['instance']['tags'] or {}
+    config_dict['instance'] = _to_yaml_keys(config_dict['instance'])
+    config_dict['autoscaling'] = _to_yaml_keys(config_dict['autoscaling'])
+    config_dict = _to_yaml_keys(config_dict)
+    
+    config_dict['sagemaker'] = {
+        'bucket': 'insights-engine-sagemaker-models',
+        'model_name': config.name,
+        'endpoint_name': f"{config.name}-endpoint",
+        'model_desc': f"{config.name} ML model",
+        'instance_type': config.instance.type,
+        'instance_count': config.instance.count
     }
     
-    with open(config_path, 'w') as f:
-        yaml.dump(config_dict, f, default_flow_style=False, sort_keys=False)
+    write_atomic(config_path, dump_yaml(config_dict).encode())
+
+def _to_yaml_keys(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Rename dataclass field names to release.yaml keys, keeping order"""
+    return {_YAML_KEYS.get(key, key): value for key, value in data.items()}
+
+def _from_yaml_keys(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Rename release.yaml keys back to dataclass field names"""
+    return {_FIELD_NAMES.get(key, key): value for key, value in data.items()}
@@ -6,53 +6,68 @@ Handles deployment to AWS (SageMaker/EKS), Lambda, Redis, API Gateway, ApigeeX.
 import argparse
 import os
 import sys
-from pathlib import Path
-from typing import Optional
+from typing import Optional, Union, TYPE_CHECKING
 
-from config import load_release_config, DeploymentConfig, save_release_config
-from fastapi_generator import generate_fastapi_wrapper
-from circleci_generator import generate_circleci_config
-from utils import show_progress, create_feature_branch, UserInputCollector
+# Everything else (utils, config, the generators, the AWS modules with yaml
+# and boto3) is imported inside the commands that use it so `--help` and
+# argument errors return without loading them
+if TYPE_CHECKING:
+    from config import DeploymentConfig
 
 
-def deploy_to_sagemaker(config: DeploymentConfig):
+def deploy_to_sagemaker(config: "DeploymentConfig"):
     """Deploy model to SageMaker"""
     from aws.sagemaker import deploy_sagemaker_endpoint
+    from utils import show_progress
     show_progress(f"Deploying {config.name} to SageMaker...")
     return deploy_sagemaker_endpoint(config)
 
 
-def deploy_lambda(config: DeploymentConfig, endpoint_name: str):
+def deploy_lambda(config: "DeploymentConfig", endpoint_name: str):
     """Deploy Lambda function"""
     from aws.lambda_deployer import deploy_lambda_function
+    from utils import show_progress
     show_progress("Deploying Lambda function...")
     return deploy_lambda_function(config, endpoint_name)
 
 
-def setup_api_gateway(config: DeploymentConfig, lambda_arn: str):
+def setup_api_gateway(config: "DeploymentConfig", lambda_arn: str):
     """Setup API Gateway (Dev only)"""
     from aws.apigateway import setup_api_gateway_with_cognito
+    from utils import show_progress
     show_progress("Setting up API Gateway...")
     return setup_api_gateway_with_cognito(config, lambda_arn)
 
 
-def setup_apigeex(config: DeploymentConfig):
+def setup_apigeex(config: "DeploymentConfig"):
     """Setup ApigeeX proxy (Stage/Prod)"""
     from apigeex.proxy import setup_apigeex_proxy
+    from utils import show_progress
     show_progress("Setting up ApigeeX proxy...")
     return setup_apigeex_proxy(config)
 
 
-def initialize_project(model_name: str, output_path: str = "."):
+def initialize_project(model_name: str, output_path: Union[str, os.PathLike] = ".",
+                       config_file: Optional[Union[str, os.PathLike]] = None):
     """
     Initialize a new ML deployment project
     Creates FastAPI wrapper and CircleCI config based on user inputs
     """
+    from config import DeploymentConfig, InstanceConfig, CacheConfig, AutoScalingConfig, save_release_config
+    from fastapi_generator import generate_fastapi_wrapper
+    from circleci_generator import write_circleci_config
+    from pathlib import Path
+    from utils import show_progress, create_feature_branch, UserInputCollector
+    
     show_progress(f"Initializing project: {model_name}")
+    out = Path(output_path)
     
-    # Collect user inputs
+    # Collect user inputs, from a config file or a single piped document when not on a terminal
     collector = UserInputCollector()
-    user_config = collector.collect_all_inputs(model_name)
+    if config_file is not None or sys.stdin.isatty():
+        user_config = collector.collect_all_inputs(model_name, config_file)
+    else:
+        user_config = collector.collect_from_stream(model_name, sys.stdin.buffer.read())
     
     # Create feature branch
     branch_name = f"feature/deploy-{model_name}"
@@ -60,68 +75,75 @@ def initialize_project(model_name: str, output_path: str = "."):
     
     # Generate FastAPI wrapper
     show_progress("Generating FastAPI wrapper...")
-    generate_fastapi_wrapper(model_name, output_path)
+    generate_fastapi_wrapper(model_name, out, list(user_config.features))
     
     # Generate release.yaml
     show_progress("Generating release.yaml...")
-    from config import DeploymentConfig, InstanceConfig, CacheConfig, AutoScalingConfig
-    
     deployment_config = DeploymentConfig(
         name=model_name,
         type="sagemaker",
         version={"major": 1, "minor": 0},
         instance=InstanceConfig(
-            type=user_config.get("instance_type", "ml.m5.xlarge"),
-            count=user_config.get("instance_count", 1),
-            volume_size_gb=user_config.get("volume_size", 50),
-            region=user_config.get("aws_region", "eu-central-1"),
+            type=user_config.instance_type,
+            count=user_config.instance_count,
+            volume_size_gb=user_config.volume_size,
+            region=user_config.aws_region,
             tags={
                 "managedby": "terraform",
                 "project": "insight-engine-2.0",
-                "team": user_config.get("team_name", "ml-team")
+                "team": user_config.team_name
             }
         ),
         cache=CacheConfig(
-            enabled=user_config.get("enable_cache", True),
-            ttl=user_config.get("cache_ttl", 3600)
+            enabled=user_config.enable_cache,
+            ttl=user_config.cache_ttl
         ),
         autoscaling=AutoScalingConfig(
-            enabled=user_config.get("enable_autoscaling", False),
-            min_instances=user_config.get("min_instances", 1),
-            max_instances=user_config.get("max_instances", 4),
-            target_invocations_per_instance=user_config.get("target_invocations", 100)
+            enabled=user_config.enable_autoscaling,
+            min_instances=user_config.min_instances,
+            max_instances=user_config.max_instances,
+            target_invocations_per_instance=user_config.target_invocations
         ),
-        environment=user_config.get("environment", "dev")
+        environment=user_config.environment
     )
     
-    save_release_config(deployment_config, os.path.join(output_path, "release.yaml"))
+    save_release_config(deployment_config, out / "release.yaml")
     
     # Generate CircleCI config
     show_progress("Generating CircleCI configuration...")
-    circleci_path = os.path.join(output_path, ".circleci", "config.yml")
-    generate_circleci_config(model_name, user_config, circleci_path)
-    
-    show_progress("✅ Project initialization complete!")
-    show_progress(f"📋 Next steps:")
-    show_progress(f"  1. Review generated files in {output_path}")
-    show_progress(f"  2. Add your model files to src/model_loader.py")
-    show_progress(f"  3. Customize src/prediction.py for your input/output")
-    show_progress(f"  4. Test locally: docker build -t {model_name}:local .")
-    show_progress(f"  5. Commit and push to trigger deployment")
-    show_progress(f"     git add .")
-    show_progress(f"     git commit -m 'feat: Add {model_name} deployment'")
-    show_progress(f"     git push origin {branch_name}")
+    circleci_dir = out / ".circleci"
+    circleci_dir.mkdir(parents=True, exist_ok=True)
+    write_circleci_config(model_name, user_config, circleci_dir / "config.yml")
+    
+    show_progress("\n".join([
+        "✅ Project initialization complete!",
+        "📋 Next steps:",
+        f"  1. Review generated files in {output_path}",
+        "  2. Add your model files to src/model_loader.py",
+        "  3. Customize src/prediction.py for your input/output",
+        f"  4. Test locally: docker build -t {model_name}:local .",
+        "  5. Commit and push to trigger deployment",
+        "     git add .",
+        f"     git commit -m 'feat: Add {model_name} deployment'",
+        f"     git push origin {branch_name}"
+    ]))
 
 
 def deploy(config_path: str = "release.yaml", environment: str = "dev"):
     """
     Deploy ML model using configuration file
     """
+    import dataclasses
+    from config import load_release_config, get_env
+    from utils import show_progress
+    
+    # Environment is read fresh once per deploy, then memoized
+    get_env.cache_clear()
+    
     show_progress(f"Starting deployment for environment: {environment}")
     
     # Load configuration
-    config = load_release_config(config_path)
-    config.environment = environment
+    config = dataclasses.replace(load_release_config(config_path), environment=environment)
     
     # Deploy SageMaker endpoint
     endpoint_info = deploy_to_sagemaker(config)
@@ -134,26 +156,30 @@ def deploy(config_path: str = "release.yaml", environment: str = "dev"):
     # Setup API Gateway or ApigeeX
     if environment == "dev":
         api_info = setup_api_gateway(config, lambda_arn)
-        show_progress("=" * 50)
-        show_progress("🎉 Deployment Complete!")
-        show_progress("=" * 50)
-        show_progress(f"API Endpoint: {api_info['endpoint_url']}")
-        show_progress(f"API Key: {api_info['api_key']}")
-        show_progress(f"Environment: {environment}")
-        show_progress("=" * 50)
+        show_progress("\n".join([
+            "=" * 50,
+            "🎉 Deployment Complete!",
+            "=" * 50,
+            f"API Endpoint: {api_info['endpoint_url']}",
+            f"API Key: {api_info['api_key']}",
+            f"Environment: {environment}",
+            "=" * 50
+        ]))
     else:
         apigeex_info = setup_apigeex(config)
-        show_progress("=" * 50)
-        show_progress("🎉 Deployment Complete!")
-        show_progress("=" * 50)
-        show_progress(f"ApigeeX Endpoint: {apigeex_info['proxy_url']}")
-        show_progress(f"Environment: {environment}")
-        show_progress("Auth: Integrated with internal auth service")
-        show_progress("=" * 50)
-
-
-def main():
-    """Main entry point"""
+        show_progress("\n".join([
+            "=" * 50,
+            "🎉 Deployment Complete!",
+            "=" * 50,
+            f"ApigeeX Endpoint: {apigeex_info['proxy_url']}",
+            f"Environment: {environment}",
+            "Auth: Integrated with internal auth service",
+            "=" * 50
+        ]))
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    """CLI parser, building it imports nothing beyond argparse"""
     parser = argparse.ArgumentParser(
         description="ML Deployment Package - Deploy models to SageMaker"
     )
@@ -164,6 +190,8 @@ def main():
     init_parser = subparsers.add_parser("init", help="Initialize new ML deployment project")
     init_parser.add_argument("model_name", help="Name of the model")
     init_parser.add_argument("--output", default=".", help="Output directory")
+    init_parser.add_argument("--config-file", default=None,
+                             help="YAML/JSON file with deployment inputs (skips the interactive prompts)")
     
     # Deploy command
     deploy_parser = subparsers.add_parser("deploy", help="Deploy ML model")
@@ -172,10 +200,16 @@ def main():
                               choices=["dev", "qa", "staging", "prod"],
                               help="Deployment environment")
     
+    return parser
+
+
+def main():
+    """Main entry point"""
+    parser = _build_parser()
     args = parser.parse_args()
     
     if args.command == "init":
-        initialize_project(args.model_name, args.output)
+        initialize_project(args.model_name, args.output, args.config_file)
     elif args.command == "deploy":
         deploy(args.config, args.environment)
     else:
@@ -3,64 +3,105 @@ FastAPI wrapper generator for ML models.
 Creates a complete FastAPI application structure for SageMaker deployment.
 """
 
+import json
+import keyword
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any
-
-class FastAPIGenerator:
-    """Generate FastAPI wrapper for ML model deployment"""
-    
-    def __init__(self, model_name: str, base_path: str = "."):
-        self.model_name = model_name
-        self.base_path = Path(base_path)
-        self.src_path = self.base_path / "src"
-        self.tests_path = self.base_path / "tests"
-    
-    def generate_all(self):
-        """Generate complete FastAPI structure"""
-        self._create_directories()
-        self._generate_app_py()
-        self._generate_health_py()
-        self._generate_prediction_py()
-        self._generate_model_loader_py()
-        self._generate_dockerfile()
-        self._generate_requirements_txt()
-        self._generate_dockerignore()
-        self._generate_tests()
-        self._generate_readme()
-        print(f"✅ FastAPI wrapper generated successfully for {self.model_name}")
-    
-    def _create_directories(self):
-        """Create project directory structure"""
-        self.src_path.mkdir(parents=True, exist_ok=True)
-        self.tests_path.mkdir(parents=True, exist_ok=True)
-        (self.src_path / "__init__.py").touch()
-        (self.tests_path / "__init__.py").touch()
-    
-    def _generate_app_py(self):
-        """Generate main FastAPI application"""
-        content = '''"""
-Main FastAPI application for {model_name}
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+# Names a generated InputFeatures field must not take: pydantic BaseModel
+# attributes (from pydantic itself when installed, otherwise the v2 set the
+# generated app pins) and the names the generated class body refers to
+try:
+    from pydantic import BaseModel as _BaseModel
+    _BASE_MODEL_ATTRIBUTES = frozenset(dir(_BaseModel))
+except ImportError:
+    _BASE_MODEL_ATTRIBUTES = frozenset({
+        "construct", "copy", "dict", "from_orm", "json", "parse_file", "parse_obj",
+        "parse_raw", "schema", "schema_json", "update_forward_refs", "validate"
+    })
+_RESERVED_FEATURE_NAMES = _BASE_MODEL_ATTRIBUTES | {"Field", "float"}
+
+# Generated project files, encoded once at import. {{NAME}} placeholders are
+# filled with bytes.replace, so rendering never re-parses a format string
+_TEMPLATES: Dict[str, bytes] = {
+    "app_py": '''"""
+Main FastAPI application for {{MODEL_NAME}}
 SageMaker BYOC deployment
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 import uvicorn
 import logging
+import os
 import sys
 
 from health import router as health_router
 from prediction import router as prediction_router
-from model_loader import ModelLoader
+from model_loader import get_model_loader
+
+try:
+    import torch
+except ImportError:
+    torch = None
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger(__name__)
+
+# Input for the warmup predictions run before serving, must match the
+# model's input schema (generated from the feature names given to init)
+WARMUP_INPUT = {{WARMUP_INPUT}}
+WARMUP_ITERATIONS = int(os.getenv("WARMUP_ITERATIONS", "3"))
+
+def warmup(model_loader):
+    """Run dummy predictions so lazy init and kernel compilation happen before the first request"""
+    try:
+        for _ in range(WARMUP_ITERATIONS):
+            model_loader.predict_uncached(WARMUP_INPUT)
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.synchronize()
+            torch.cuda.empty_cache()
+        logger.info(f"✅ Model warmed up ({WARMUP_ITERATIONS} predictions)")
+    except Exception as e:
+        logger.warning(f"⚠️  Warmup skipped: {str(e)}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load and warm up the model on startup, clean up on shutdown"""
+    logger.info("🚀 Starting {{MODEL_NAME}} service...")
+    try:
+        # Loads the shared model once, before the first request
+        model_loader = get_model_loader()
+        logger.info("✅ Model loaded successfully")
+    except Exception as e:
+        logger.error(f"❌ Failed to load model: {str(e)}", exc_info=True)
+        raise
+    
+    warmup(model_loader)
+    yield
+    logger.info("Shutting down {{MODEL_NAME}} service...")
 
 # Initialize FastAPI
 app = FastAPI(
-    title="{model_name} API",
+    title="{{MODEL_NAME}} API",
     description="SageMaker BYOC Model Inference Service",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -72,69 +113,52 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout)
-    ]
-)
-logger = logging.getLogger(__name__)
-
-# Global model loader
-model_loader = ModelLoader()
+# Compress large (batch) responses, small ones are not worth the CPU
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 # Include routers
 app.include_router(health_router, tags=["Health"])
 app.include_router(prediction_router, tags=["Prediction"])
 
-@app.on_event("startup")
-async def startup_event():
-    """Load model on startup"""
-    logger.info("🚀 Starting {model_name} service...")
-    try:
-        model_loader.load_model()
-        logger.info("✅ Model loaded successfully")
-    except Exception as e:
-        logger.error(f"❌ Failed to load model: {{str(e)}}", exc_info=True)
-        raise
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Cleanup on shutdown"""
-    logger.info("Shutting down {model_name} service...")
-
 @app.get("/")
 async def root():
     """Root endpoint"""
-    return {{
-        "service": "{model_name}",
+    return {
+        "service": "{{MODEL_NAME}}",
         "version": "1.0.0",
         "status": "running",
-        "endpoints": {{
+        "endpoints": {
             "health": "/ping or /health",
             "inference": "/invocations",
             "docs": "/docs"
-        }}
-    }}
+        }
+    }
 
 if __name__ == "__main__":
+    # One worker process per core, override with WEB_CONCURRENCY
+    workers = int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+    # Serve on the socket pre-bound by launcher.py (--fd), on a UNIX socket
+    # behind a separately run reverse proxy (see nginx.conf, not for SageMaker)
+    # when UVICORN_UDS is set, otherwise on TCP port 8080
+    sock_path = os.getenv("UVICORN_UDS")
+    if "--fd" in sys.argv:
+        bind = dict(fd=int(sys.argv[sys.argv.index("--fd") + 1]))
+    elif sock_path:
+        bind = dict(uds=sock_path)
+    else:
+        bind = dict(host="0.0.0.0", port=8080)
     uvicorn.run(
-        app,
-        host="0.0.0.0",
-        port=8080,
+        "app:app",
+        **bind,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
         log_level="info",
-        access_log=True
+        log_config=None,  # keep the logging.basicConfig setup above
+        access_log=False
     )
-'''.format(model_name=self.model_name)
-        
-        with open(self.src_path / "app.py", "w") as f:
-            f.write(content)
-    
-    def _generate_health_py(self):
-        """Generate health check endpoint"""
-        content = '''"""
+'''.encode("utf-8"),
+    "health_py": '''"""
 Health check endpoint for SageMaker container
 Must return 200 for container to be considered healthy
 """
@@ -142,13 +166,48 @@ Must return 200 for container to be considered healthy
 from fastapi import APIRouter
 from fastapi.responses import JSONResponse
 from datetime import datetime
+import asyncio
 import logging
 import psutil
 import os
+import time
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# System metrics are re-sampled at most every SYSTEM_METRICS_TTL seconds,
+# disk usage (a filesystem stat) every DISK_METRICS_TTL seconds
+SYSTEM_METRICS_TTL = 5.0
+DISK_METRICS_TTL = 30.0
+_system_metrics = {"sampled_at": 0.0, "values": None}
+_disk_metrics = {"sampled_at": 0.0, "percent": None}
+
+# Prime psutil's CPU counters so later non-blocking reads return real usage
+psutil.cpu_percent(interval=None)
+
+def _sample_system_metrics() -> dict:
+    """Read system metrics without blocking (CPU usage since the previous call)"""
+    now = time.monotonic()
+    if _disk_metrics["percent"] is None or now - _disk_metrics["sampled_at"] >= DISK_METRICS_TTL:
+        _disk_metrics["percent"] = psutil.disk_usage('/').percent
+        _disk_metrics["sampled_at"] = now
+    
+    return {
+        "cpu_percent": psutil.cpu_percent(interval=None),
+        "memory_percent": psutil.virtual_memory().percent,
+        "disk_percent": _disk_metrics["percent"],
+        "pid": os.getpid()
+    }
+
+async def get_system_metrics() -> dict:
+    """Cached system metrics, sampled in a worker thread off the event loop"""
+    now = time.monotonic()
+    if _system_metrics["values"] is None or now - _system_metrics["sampled_at"] >= SYSTEM_METRICS_TTL:
+        loop = asyncio.get_running_loop()
+        _system_metrics["values"] = await loop.run_in_executor(None, _sample_system_metrics)
+        _system_metrics["sampled_at"] = now
+    return _system_metrics["values"]
+
 @router.get("/ping")
 @router.get("/health")
 async def health_check():
@@ -171,23 +230,13 @@ async def health_check():
                 }
             )
         
-        # Get system metrics
-        cpu_percent = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
-        
         return JSONResponse(
             status_code=200,
             content={
                 "status": "UP",
                 "model_loaded": True,
                 "timestamp": datetime.utcnow().isoformat(),
-                "system": {
-                    "cpu_percent": cpu_percent,
-                    "memory_percent": memory.percent,
-                    "disk_percent": disk.percent,
-                    "pid": os.getpid()
-                }
+                "system": await get_system_metrics()
             }
         )
     
@@ -217,51 +266,60 @@ async def liveness_check():
             "timestamp": datetime.utcnow().isoformat()
         }
     )
-'''
-        
-        with open(self.src_path / "health.py", "w") as f:
-            f.write(content)
-    
-    def _generate_prediction_py(self):
-        """Generate prediction endpoint"""
-        content = '''"""
+'''.encode("utf-8"),
+    "prediction_py": '''"""
 Main inference endpoint for ML predictions
 Handles POST requests to /invocations
 """
 
 from fastapi import APIRouter, Request, HTTPException
 from fastapi.responses import ORJSONResponse
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError
 from typing import Dict, Any, List, Optional
 import logging
 from datetime import datetime
+import struct
 import time
+import numpy as np
+import orjson
 
-from model_loader import ModelLoader
+from model_loader import get_model_loader
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
-model_loader = ModelLoader()
 
 # Input schema (customize based on your model)
-class PredictionInput(BaseModel):
-    """Input schema for predictions"""
-    features: Dict[str, Any] = Field(..., description="Input features for prediction")
-    
-    class Config:
-        schema_extra = {
-            "example": {
-                "features": {
-                    "feature1": 1.0,
-                    "feature2": 2.0,
-                    "feature3": "category_a"
-                }
-            }
-        }
+{{INPUT_SCHEMA}}
+# Built once, validates raw request bytes without an intermediate dict
+_INPUT_ADAPTER = TypeAdapter(PredictionInput)
+_FEATURES_ADAPTER = TypeAdapter(PredictionInput.model_fields["features"].annotation)
+
+def parse_input(body: bytes) -> PredictionInput:
+    """
+    Validate an /invocations body: {"features": {...}}, or the bare feature
+    mapping as also accepted for /batch-invocations items
+    """
+    try:
+        return _INPUT_ADAPTER.validate_json(body)
+    except ValidationError as e:
+        if not any(err["type"] == "missing" and err["loc"] == ("features",) for err in e.errors()):
+            raise
+    return PredictionInput(features=_FEATURES_ADAPTER.validate_json(body))
+
+def parse_batch_item(item: Any) -> Dict[str, Any]:
+    """
+    Validate one /batch-invocations JSON item like an /invocations body
+    Typed schemas return the features in field (model column) order
+    """
+    if not isinstance(item, dict):
+        raise ValueError("Batch items must be JSON objects")
+    return dict(_FEATURES_ADAPTER.validate_python(item.get("features", item)))
 
 # Output schema (customize based on your model)
 class PredictionOutput(BaseModel):
     """Output schema for predictions"""
+    model_config = ConfigDict(frozen=True, extra="ignore")
+    
     prediction: Any = Field(..., description="Model prediction")
     confidence: Optional[float] = Field(None, description="Prediction confidence score")
     model_version: str = Field(..., description="Model version")
@@ -272,31 +330,31 @@ class PredictionOutput(BaseModel):
 async def invoke(request: Request):
     """
     Main inference endpoint
-    Accepts JSON input and returns model predictions
+    Accepts {"features": {...}} or a bare feature mapping and returns model predictions
     """
     start_time = time.time()
     
     try:
-        # Parse input
-        input_data = await request.json()
-        logger.info(f"Received inference request: {type(input_data)}")
+        # Parse and validate input (ValidationError is a ValueError, answered with 400)
+        payload = parse_input(await request.body())
+        features = dict(payload.features)
+        logger.info(f"Received inference request: {len(features)} features")
         
-        # Validate input
-        if not input_data:
+        if not features:
             raise HTTPException(status_code=400, detail="Empty input data")
         
         # TODO: Implement your preprocessing logic
-        processed_input = preprocess_input(input_data)
+        processed_input = preprocess_input(features)
         
         # Make prediction
         # TODO: Replace with actual model inference
-        prediction_result = model_loader.predict(processed_input)
+        prediction_result = get_model_loader().predict(processed_input)
         
         # Calculate inference time
         inference_time = (time.time() - start_time) * 1000
         
-        # Format response
-        response = PredictionOutput(
+        # Format response, fields are built here so skip revalidating them
+        response = PredictionOutput.model_construct(
             prediction=prediction_result.get("prediction"),
             confidence=prediction_result.get("confidence"),
             model_version="1.0.0",
@@ -305,7 +363,10 @@ async def invoke(request: Request):
         )
         
         logger.info(f"Prediction successful (took {inference_time:.2f}ms)")
-        return response
+        return ORJSONResponse(content=response.__dict__)
+    
+    except HTTPException:
+        raise
     
     except ValueError as e:
         logger.error(f"Validation error: {str(e)}")
@@ -315,14 +376,11 @@ async def invoke(request: Request):
         logger.error(f"Prediction error: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
 
-def preprocess_input(input_data: Dict[str, Any]) -> Dict[str, Any]:
+def preprocess_input(features: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Preprocess input data before prediction
+    Preprocess input features before prediction
     TODO: Implement your preprocessing logic
     """
-    # Example preprocessing
-    features = input_data.get("features", input_data)
-    
     # Validate required features
     # if "required_feature" not in features:
     #     raise ValueError("Missing required feature: required_feature")
@@ -333,20 +391,30 @@ def preprocess_input(input_data: Dict[str, Any]) -> Dict[str, Any]:
 async def batch_invoke(request: Request):
     """
     Batch inference endpoint for processing multiple predictions
+    Accepts a JSON list, or with Content-Type application/octet-stream a
+    little-endian uint32 row count, uint32 column count and float32 rows
     """
     start_time = time.time()
-    
+
     try:
-        input_batch = await request.json()
-        
-        if not isinstance(input_batch, list):
-            raise HTTPException(status_code=400, detail="Input must be a list")
-        
-        results = []
-        for item in input_batch:
-            processed_input = preprocess_input(item)
-            prediction = model_loader.predict(processed_input)
-            results.append(prediction)
+        body = await request.body()
+
+        if request.headers.get("content-type", "").startswith("application/octet-stream"):
+            # Binary batch, used as the model input without any decoding
+            batch = decode_binary_batch(body)
+        else:
+            input_batch = orjson.loads(body)
+
+            if not isinstance(input_batch, list):
+                raise HTTPException(status_code=400, detail="Input must be a list")
+
+            # Stack into one array so the model runs once for the whole batch
+            # (free-form feature values must be numeric and in the same order
+            # for every item, typed ones are ordered by the schema)
+            features = [preprocess_input(parse_batch_item(item)) for item in input_batch]
+            batch = np.asarray([list(f.values()) for f in features], dtype=np.float32)
+
+        results = get_model_loader().predict_batch(batch)
         
         inference_time = (time.time() - start_time) * 1000
         
@@ -357,36 +425,127 @@ async def batch_invoke(request: Request):
             "timestamp": datetime.utcnow().isoformat()
         })
     
+    except HTTPException:
+        raise
+    
+    except ValueError as e:
+        logger.error(f"Validation error: {str(e)}")
+        raise HTTPException(status_code=400, detail=f"Invalid input: {str(e)}")
+    
     except Exception as e:
         logger.error(f"Batch prediction error: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Batch prediction failed")
-'''
-        
-        with open(self.src_path / "prediction.py", "w") as f:
-            f.write(content)
-    
-    def _generate_model_loader_py(self):
-        """Generate model loader module"""
-        content = '''"""
+
+def decode_binary_batch(body: bytes) -> np.ndarray:
+    """
+    Zero-copy view of a binary batch: <uint32 rows><uint32 columns> header
+    followed by rows * columns little-endian float32 values
+    """
+    if len(body) < 8:
+        raise ValueError("Binary batch is missing its 8-byte header")
+    rows, columns = struct.unpack_from("<II", body)
+    if len(body) != 8 + 4 * rows * columns:
+        raise ValueError(f"Binary batch body does not hold {rows}x{columns} float32 values")
+    return np.frombuffer(body, dtype="<f4", offset=8).reshape(rows, columns)
+'''.encode("utf-8"),
+    "model_loader_py": '''"""
 Model loader module
 Handles loading and initializing the ML model
 """
 
+import fcntl
 import logging
 import os
-from typing import Dict, Any
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, Any, List, Union
 import joblib
+import numpy as np
+import orjson
 import pickle
 
 logger = logging.getLogger(__name__)
 
+# Number of distinct inputs whose predictions are kept in memory (0 disables)
+PRED_CACHE_SIZE = int(os.getenv("PRED_CACHE_SIZE", "1024"))
+
+# Lock file that serializes model loading across uvicorn worker processes
+MODEL_LOAD_LOCK = os.getenv("MODEL_LOAD_LOCK", "/tmp/model_load.lock")
+
+# Opt in to int8 dynamic quantization at load time (CPU instance types)
+ENABLE_INT8 = os.getenv("ENABLE_INT8", "0") == "1"
+
+# ONNX model under MODEL_PATH, served with onnxruntime when present
+ONNX_MODEL_FILE = os.getenv("ONNX_MODEL_FILE", "model.onnx")
+
+# Read the weights into the page cache in the background while the model
+# framework is imported (set MODEL_PREFETCH=0 to disable)
+MODEL_PREFETCH = os.getenv("MODEL_PREFETCH", "1") == "1"
+PREFETCH_CHUNK_SIZE = 1 << 20
+
+def _prefetch_files(paths: List[str]):
+    """Pull files into the page cache with sequential readahead"""
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            # Advice values are not flags, they are given one at a time
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            offset = 0
+            while chunk := os.pread(fd, PREFETCH_CHUNK_SIZE, offset):
+                offset += len(chunk)
+        except OSError as e:
+            logger.debug(f"Prefetch of {path} stopped: {str(e)}")
+        finally:
+            os.close(fd)
+
+def prefetch_model_files(model_path: str) -> threading.Thread:
+    """Start prefetching every file under model_path in a daemon thread"""
+    paths = sorted(
+        os.path.join(root, name)
+        for root, _, names in os.walk(model_path)
+        for name in names
+    )
+    thread = threading.Thread(target=_prefetch_files, args=(paths,), name="model-prefetch", daemon=True)
+    thread.start()
+    return thread
+
+class _PredictionKey:
+    """
+    Prediction cache key: hashed and compared as canonical JSON (sorted keys)
+    while keeping the input dict as received, so a cache miss runs the model
+    on the features in their original order
+    """
+    __slots__ = ("payload", "input_data")
+    
+    def __init__(self, input_data: Dict[str, Any]):
+        self.input_data = input_data
+        self.payload = orjson.dumps(input_data, option=orjson.OPT_SORT_KEYS)
+    
+    def __hash__(self) -> int:
+        return hash(self.payload)
+    
+    def __eq__(self, other) -> bool:
+        return isinstance(other, _PredictionKey) and self.payload == other.payload
+
 class ModelLoader:
     """Load and manage ML model"""
     
     def __init__(self):
         self.model = None
+        self.session = None
+        self._input_name = None
         self.model_path = os.getenv("MODEL_PATH", "/opt/ml/model")
         self.is_loaded = False
+        # Weights stream in from disk while load_model imports the framework
+        self._prefetch = prefetch_model_files(self.model_path) if MODEL_PREFETCH else None
+        # Repeated inputs are answered from an LRU instead of rerunning the model
+        self._cached_predict = lru_cache(maxsize=PRED_CACHE_SIZE)(self._predict_key)
     
     def load_model(self):
         """
@@ -396,20 +555,60 @@ class ModelLoader:
         try:
             logger.info(f"Loading model from {self.model_path}")
             
+            # Default: ONNX Runtime (fused graph, MLAS CPU kernels)
+            onnx_file = os.path.join(self.model_path, ONNX_MODEL_FILE)
+            if os.path.exists(onnx_file):
+                self._load_onnx(onnx_file)
+            
+            # Fallback: framework-native loading when there is no ONNX export
             # Example: Load scikit-learn model
             # model_file = os.path.join(self.model_path, "model.pkl")
             # self.model = joblib.load(model_file)
-            
-            # Example: Load PyTorch model
+            # if ENABLE_INT8:
+            #     # Convert to ONNX and serve int8 weights through onnxruntime
+            #     # (quantizes MatMul-heavy models such as linear models and MLPs)
+            #     import onnxruntime as ort
+            #     from onnxruntime.quantization import QuantType, quantize_dynamic
+            #     from skl2onnx import to_onnx
+            #     onnx_file, int8_file = "/tmp/model.onnx", "/tmp/model.int8.onnx"
+            #     sample = np.zeros((1, self.model.n_features_in_), dtype=np.float32)
+            #     with open(onnx_file, "wb") as f:
+            #         f.write(to_onnx(self.model, sample).SerializeToString())
+            #     quantize_dynamic(onnx_file, int8_file, weight_type=QuantType.QInt8)
+            #     self.model = ort.InferenceSession(int8_file, providers=["CPUExecutionProvider"])
+
+            # Example: Load PyTorch model (torch 2.2+)
+            # mmap=True maps the checkpoint instead of reading it into memory and
+            # assign=True keeps the mapped tensors, so load time is page-ins only
             # import torch
+            # from my_model import MyModel
             # model_file = os.path.join(self.model_path, "model.pt")
-            # self.model = torch.load(model_file)
+            # state = torch.load(model_file, map_location="cpu", mmap=True, weights_only=True)
+            # with torch.device("meta"):
+            #     self.model = MyModel()
+            # self.model.load_state_dict(state, assign=True)
             # self.model.eval()
-            
+            # if ENABLE_INT8:
+            #     # int8 Linear layers, run as VNNI dot products on ml.m5/ml.c5
+            #     self.model = torch.ao.quantization.quantize_dynamic(
+            #         self.model, {torch.nn.Linear}, dtype=torch.qint8
+            #     )
+            # try:
+            #     # Compiled on the first call, i.e. during the startup warmup
+            #     self.model = torch.compile(self.model, mode="reduce-overhead", fullgraph=False)
+            # except Exception as e:
+            #     logger.warning(f"torch.compile unavailable, running eager: {str(e)}")
+
             # Example: Load TensorFlow model
             # import tensorflow as tf
             # self.model = tf.keras.models.load_model(self.model_path)
-            
+            # if ENABLE_INT8:
+            #     # TFLite with int8 weights (predict via the interpreter's tensors)
+            #     converter = tf.lite.TFLiteConverter.from_keras_model(self.model)
+            #     converter.optimizations = [tf.lite.Optimize.DEFAULT]
+            #     self.model = tf.lite.Interpreter(model_content=converter.convert())
+            #     self.model.allocate_tensors()
+
             # For now, just mark as loaded
             self.is_loaded = True
             logger.info("✅ Model loaded successfully")
@@ -418,7 +617,45 @@ class ModelLoader:
             logger.error(f"Failed to load model: {str(e)}", exc_info=True)
             raise
     
+    def _load_onnx(self, model_file: str):
+        """Create an onnxruntime session with all graph optimizations enabled"""
+        import onnxruntime as ort
+        
+        # Uvicorn runs one worker per core, so default to one thread per worker
+        workers = int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+        threads = int(os.getenv("OMP_NUM_THREADS", max(1, (os.cpu_count() or 1) // workers)))
+        
+        sess_opts = ort.SessionOptions()
+        sess_opts.intra_op_num_threads = threads
+        sess_opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        sess_opts.enable_mem_pattern = True
+        sess_opts.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        self.session = ort.InferenceSession(model_file, sess_opts, providers=["CPUExecutionProvider"])
+        self._input_name = self.session.get_inputs()[0].name
+        logger.info(f"Serving {model_file} with onnxruntime ({threads} threads)")
+    
+    def _run_onnx(self, X: np.ndarray) -> List[Dict[str, Any]]:
+        """Run the ONNX session once on a 2D float32 feature array"""
+        # TODO: Map further outputs (e.g. class probabilities) to confidence
+        outputs = self.session.run(None, {self._input_name: X})
+        return [{"prediction": p, "confidence": None} for p in outputs[0].tolist()]
+    
     def predict(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Make prediction, reusing the cached result for an identical input
+        The returned dict is shared with the cache, don't modify it
+        """
+        if not self.is_loaded:
+            raise RuntimeError("Model not loaded")
+        
+        # Equal inputs share one cache entry whatever their key order
+        return self._cached_predict(_PredictionKey(input_data))
+    
+    def _predict_key(self, key: _PredictionKey) -> Dict[str, Any]:
+        """Cache miss, run the model on the input as received"""
+        return self.predict_uncached(key.input_data)
+    
+    def predict_uncached(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Make prediction with loaded model
         TODO: Implement your prediction logic
@@ -427,6 +664,9 @@ class ModelLoader:
             raise RuntimeError("Model not loaded")
         
         try:
+            if self.session is not None:
+                return self._run_onnx(np.asarray([list(input_data.values())], dtype=np.float32))[0]
+            
             # TODO: Implement actual prediction logic
             # Example for scikit-learn:
             # prediction = self.model.predict([input_data])
@@ -448,19 +688,102 @@ class ModelLoader:
             logger.error(f"Prediction failed: {str(e)}", exc_info=True)
             raise
     
+    def predict_batch(self, X: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        Make predictions for a batch of feature rows in a single model call
+        TODO: Implement your batch prediction logic
+        """
+        if not self.is_loaded:
+            raise RuntimeError("Model not loaded")
+        
+        try:
+            if self.session is not None:
+                return self._run_onnx(X)
+            
+            # TODO: Implement actual batch prediction logic
+            # Example for scikit-learn (one predict call for all rows):
+            # predictions = self.model.predict(X)
+            
+            # Example for PyTorch (one kernel launch for the whole batch):
+            # import torch
+            # with torch.no_grad():
+            #     predictions = self.model(torch.from_numpy(X).cuda()).cpu().numpy()
+            
+            # Placeholder response
+            return [
+                {"prediction": "placeholder_prediction", "confidence": 0.95}
+                for _ in range(len(X))
+            ]
+        
+        except Exception as e:
+            logger.error(f"Batch prediction failed: {str(e)}", exc_info=True)
+            raise
+    
     def unload_model(self):
         """Unload model from memory"""
         self.model = None
+        self.session = None
         self.is_loaded = False
+        self._cached_predict.cache_clear()
         logger.info("Model unloaded")
-'''
-        
-        with open(self.src_path / "model_loader.py", "w") as f:
-            f.write(content)
-    
-    def _generate_dockerfile(self):
-        """Generate Dockerfile"""
-        content = '''# Multi-stage build for optimized image size
+
+@lru_cache(maxsize=1)
+def get_model_loader() -> ModelLoader:
+    """
+    Shared model loader for the process
+    The model is loaded once on first call and reused by every request
+    """
+    model_loader = ModelLoader()
+    with _load_lock():
+        model_loader.load_model()
+    return model_loader
+
+@contextmanager
+def _load_lock():
+    """
+    Exclusive lock held while loading the model
+    Workers take turns so the checkpoint isn't deserialized by all of them at once
+    """
+    with open(MODEL_LOAD_LOCK, "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+'''.encode("utf-8"),
+    "launcher_py": '''"""
+Container entrypoint
+Binds the serving port before the app (and the model framework) is imported,
+so health checks queue in the kernel instead of getting connection refused
+"""
+
+import os
+import socket
+import sys
+
+PORT = 8080
+
+if __name__ == "__main__":
+    src_dir = os.path.dirname(os.path.abspath(__file__))
+    # The image ships bytecode only, local runs have the sources
+    app = next(
+        path for path in (os.path.join(src_dir, name) for name in ("app.py", "app.pyc"))
+        if os.path.exists(path)
+    )
+    args = [sys.executable, app]
+
+    if not os.getenv("UVICORN_UDS"):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(("0.0.0.0", PORT))
+        sock.listen(2048)
+        sock.set_inheritable(True)
+        args += ["--fd", str(sock.fileno())]
+
+    os.execv(sys.executable, args)
+'''.encode("utf-8"),
+    "dockerfile": '''# syntax=docker/dockerfile:1.7
+# Multi-stage build for optimized image size
 FROM python:3.11-slim-bullseye AS builder
 
 # Build arguments
@@ -470,43 +793,81 @@ ENV FURY_AUTH=$FURY_TOKEN
 
 WORKDIR /app
 
+# Keep downloaded apt packages in the BuildKit cache mounts below
+RUN rm -f /etc/apt/apt.conf.d/docker-clean && \\
+    echo 'Binary::apt::APT::Keep-Downloaded-Packages "true";' > /etc/apt/apt.conf.d/keep-cache
+
 # Install system dependencies
-RUN apt-get update && apt-get install -y \\
+RUN --mount=type=cache,target=/var/cache/apt,sharing=locked \\
+    --mount=type=cache,target=/var/lib/apt,sharing=locked \\
+    apt-get update && apt-get install -y --no-install-recommends \\
     gcc \\
     g++ \\
-    git \\
-    && rm -rf /var/lib/apt/lists/*
+    git
 
-# Install Python dependencies
+# Install Python dependencies with uv, reusing its wheel cache across builds
+# (requirements.txt is copied on its own so src/ changes keep this layer),
+# then precompile them for the PYTHONOPTIMIZE=2 runtime
+ENV UV_LINK_MODE=copy
 COPY requirements.txt .
-RUN pip install --no-cache-dir --upgrade pip && \\
-    pip install --no-cache-dir -r requirements.txt
+RUN --mount=type=cache,target=/root/.cache/pip \\
+    --mount=type=cache,target=/root/.cache/uv \\
+    pip install uv && \\
+    uv pip install --system -r requirements.txt && \\
+    python -m compileall -q -j0 -o2 /usr/local/lib/python3.11/site-packages
+
+# Bake the model weights into the image so containers don't download them
+# at startup. Pass --build-arg MODEL_URI=s3://bucket/prefix and the AWS
+# credentials file as --secret id=aws,src=$HOME/.aws/credentials
+# (empty MODEL_URI leaves /opt/ml/model empty)
+ARG MODEL_URI=""
+RUN --mount=type=secret,id=aws,target=/root/.aws/credentials \\
+    --mount=type=cache,target=/root/.cache/uv \\
+    mkdir -p /opt/ml/model && \\
+    if [ -n "$MODEL_URI" ]; then \\
+        uv pip install --system --prefix /opt/awscli awscli && \\
+        PYTHONPATH=/opt/awscli/lib/python3.11/site-packages \\
+            /opt/awscli/bin/aws s3 sync "$MODEL_URI" /opt/ml/model; \\
+    fi
 
 # Production stage
 FROM python:3.11-slim-bullseye
 
 WORKDIR /app
 
-# Install runtime dependencies only
-RUN apt-get update && apt-get install -y \\
+# Install runtime dependencies only (tini reaps the uvicorn workers and
+# forwards signals, SageMaker runs the image without --init)
+RUN rm -f /etc/apt/apt.conf.d/docker-clean && \\
+    echo 'Binary::apt::APT::Keep-Downloaded-Packages "true";' > /etc/apt/apt.conf.d/keep-cache
+RUN --mount=type=cache,target=/var/cache/apt,sharing=locked \\
+    --mount=type=cache,target=/var/lib/apt,sharing=locked \\
+    apt-get update && apt-get install -y --no-install-recommends \\
     libgomp1 \\
-    && rm -rf /var/lib/apt/lists/*
+    tini
 
 # Copy Python packages from builder
 COPY --from=builder /usr/local/lib/python3.11/site-packages /usr/local/lib/python3.11/site-packages
 COPY --from=builder /usr/local/bin /usr/local/bin
 
-# Copy application code
-COPY src/ ./src/
+# Copy application code and the baked model weights
+COPY --link src/ ./src/
+COPY --link --from=builder /opt/ml/model /opt/ml/model
 
-# Create model directory
-RUN mkdir -p /opt/ml/model
+# Precompile the app to .pyc files next to the modules (-b) and drop the
+# sources, so containers start without parsing or compiling anything
+RUN python -m compileall -q -j0 -o2 -b src && \\
+    find src -name '*.py' -delete
 
 # Set environment variables
 ENV PYTHONPATH="${PYTHONPATH}:/app"
 ENV PYTHONUNBUFFERED=1
+ENV PYTHONDONTWRITEBYTECODE=1
+ENV PYTHONOPTIMIZE=2
 ENV MODEL_PATH=/opt/ml/model
 
+# Load the model once at build time so broken or missing weights fail the build
+RUN cd src && python -c "from model_loader import ModelLoader; ModelLoader().load_model()"
+
 # Expose port
 EXPOSE 8080
 
@@ -514,18 +875,14 @@ EXPOSE 8080
 HEALTHCHECK --interval=30s --timeout=3s --start-period=60s --retries=3 \\
     CMD python -c "import requests; requests.get('http://localhost:8080/ping')"
 
-# Run application
-ENTRYPOINT ["python", "src/app.py"]
-'''
-        
-        with open(self.base_path / "Dockerfile", "w") as f:
-            f.write(content)
-    
-    def _generate_requirements_txt(self):
-        """Generate requirements.txt"""
-        content = '''# FastAPI and web framework
+# Run application, the launcher binds port 8080 before the app is imported
+ENTRYPOINT ["tini", "--", "python", "src/launcher.pyc"]
+'''.encode("utf-8"),
+    "requirements_txt": '''# FastAPI and web framework
 fastapi==0.104.1
 uvicorn[standard]==0.24.0
+uvloop==0.19.0
+httptools==0.6.1
 pydantic==2.5.0
 python-multipart==0.0.6
 
@@ -534,12 +891,16 @@ httpx==0.25.1
 orjson==3.9.10
 requests==2.31.0
 
+# Batch inference arrays
+numpy==1.26.2
+
 # ML libraries (uncomment as needed)
 # scikit-learn==1.3.2
-# numpy==1.26.2
 # pandas==2.1.3
-# torch==2.1.0
+# torch==2.2.0  # 2.2+ for mmap checkpoint loading
 # tensorflow==2.14.0
+# skl2onnx==1.16.0  # scikit-learn to ONNX, for ENABLE_INT8
+# onnxruntime==1.17.1  # serves MODEL_PATH/model.onnx when present
 
 # Monitoring and utilities
 psutil==5.9.6
@@ -551,14 +912,8 @@ botocore==1.32.7
 
 # Model serialization
 joblib==1.3.2
-'''
-        
-        with open(self.base_path / "requirements.txt", "w") as f:
-            f.write(content)
-    
-    def _generate_dockerignore(self):
-        """Generate .dockerignore"""
-        content = '''# Python
+'''.encode("utf-8"),
+    "dockerignore": '''# Python
 __pycache__/
 *.py[cod]
 *$py.class
@@ -597,14 +952,43 @@ docs/
 
 # Tests
 tests/
-'''
-        
-        with open(self.base_path / ".dockerignore", "w") as f:
-            f.write(content)
-    
-    def _generate_tests(self):
-        """Generate test files"""
-        test_health = '''"""
+'''.encode("utf-8"),
+    "nginx_conf": '''# Optional reverse proxy for serving the app over a UNIX socket, outside
+# SageMaker only: the image doesn't ship nginx, so run it as a sidecar
+# sharing /tmp with the app container. Start the app with
+# UVICORN_UDS=/tmp/uvicorn.sock and nginx -c nginx.conf: nginx listens on
+# port 8080 and talks to uvicorn without TCP
+worker_processes auto;
+
+events {
+    worker_connections 1024;
+}
+
+http {
+    access_log off;
+
+    upstream app {
+        server unix:/tmp/uvicorn.sock;
+        keepalive 64;
+    }
+
+    server {
+        listen 8080 deferred;
+        # SageMaker caps invocation payloads at 6 MB
+        client_max_body_size 6m;
+        keepalive_timeout 75s;
+
+        location / {
+            proxy_pass http://app;
+            proxy_http_version 1.1;
+            proxy_set_header Connection "";
+            proxy_set_header Host $host;
+            proxy_read_timeout 60s;
+        }
+    }
+}
+'''.encode("utf-8"),
+    "test_health_py": '''"""
 Unit tests for health endpoint
 """
 
@@ -640,59 +1024,99 @@ def test_liveness_endpoint():
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "ALIVE"
-'''
-        
-        test_inference = '''"""
+'''.encode("utf-8"),
+    "test_inference_py": '''"""
 Unit tests for inference endpoint
 """
 
+import struct
+
+import numpy as np
 import pytest
 from fastapi.testclient import TestClient
 from src.app import app
+from src.model_loader import ModelLoader
+import src.prediction as prediction
 
 client = TestClient(app)
 
 def test_invocations_endpoint():
     """Test /invocations endpoint with valid input"""
-    payload = {
-        "features": {
-            "feature1": 1.0,
-            "feature2": 2.0
-        }
-    }
+    payload = {{INPUT_EXAMPLE}}
     response = client.post("/invocations", json=payload)
     assert response.status_code == 200
     data = response.json()
     assert "prediction" in data
     assert "timestamp" in data
 
+def test_invocations_bare_features():
+    """Test /invocations with a bare feature mapping"""
+    payload = {{INPUT_EXAMPLE}}["features"]
+    response = client.post("/invocations", json=payload)
+    assert response.status_code == 200
+    assert "prediction" in response.json()
+
 def test_invocations_empty_input():
     """Test /invocations with empty input"""
     response = client.post("/invocations", json={})
     # Should handle gracefully
 
+def test_predict_keeps_feature_order(monkeypatch):
+    """Test cache misses see the features in request order, not sorted"""
+    loader = ModelLoader()
+    loader.is_loaded = True
+    seen = []
+    monkeypatch.setattr(loader, "predict_uncached", lambda data: seen.append(list(data)) or {})
+    loader.predict({"zeta": 1.0, "alpha": 2.0})
+    # Same input with another key order is a cache hit
+    loader.predict({"alpha": 2.0, "zeta": 1.0})
+    assert seen == [["zeta", "alpha"]]
+
 def test_batch_invocations():
     """Test batch predictions"""
     payload = [
-        {"features": {"feature1": 1.0}},
-        {"features": {"feature1": 2.0}}
+        {{INPUT_EXAMPLE}},
+        {{INPUT_EXAMPLE}}["features"]
     ]
     response = client.post("/batch-invocations", json=payload)
     assert response.status_code == 200
     data = response.json()
     assert "predictions" in data
     assert data["count"] == 2
-'''
-        
-        with open(self.tests_path / "test_health.py", "w") as f:
-            f.write(test_health)
-        
-        with open(self.tests_path / "test_inference.py", "w") as f:
-            f.write(test_inference)
-    
-    def _generate_readme(self):
-        """Generate README.md"""
-        content = f'''# {self.model_name} - SageMaker Deployment
+
+def test_batch_invalid_item():
+    """Test batch with an item that isn't a JSON object"""
+    response = client.post("/batch-invocations", json=[{{INPUT_EXAMPLE}}, 1.0])
+    assert response.status_code == 400
+
+@pytest.mark.skipif(not hasattr(prediction, "InputFeatures"), reason="free-form features keep request order")
+def test_batch_item_schema_order():
+    """Test batch items are put in schema field order whatever their key order"""
+    features = {{INPUT_EXAMPLE}}["features"]
+    reordered = dict(reversed(list(features.items())))
+    assert list(prediction.parse_batch_item({"features": reordered})) == list(features)
+
+def test_binary_batch_invocations():
+    """Test batch predictions from a binary float32 body"""
+    batch = np.arange(6, dtype="<f4").reshape(3, 2)
+    response = client.post(
+        "/batch-invocations",
+        content=struct.pack("<II", *batch.shape) + batch.tobytes(),
+        headers={"Content-Type": "application/octet-stream"}
+    )
+    assert response.status_code == 200
+    assert response.json()["count"] == 3
+
+def test_binary_batch_size_mismatch():
+    """Test binary batch whose header doesn't match the body"""
+    response = client.post(
+        "/batch-invocations",
+        content=struct.pack("<II", 3, 2) + b"\\x00" * 4,
+        headers={"Content-Type": "application/octet-stream"}
+    )
+    assert response.status_code == 400
+'''.encode("utf-8"),
+    "readme_md": '''# {{MODEL_NAME}} - SageMaker Deployment
 
 ML model inference service deployed on AWS SageMaker using BYOC (Bring Your Own Container).
 
@@ -719,14 +1143,35 @@ curl http://localhost:8080/ping
 ```bash
 curl -X POST http://localhost:8080/invocations \\
   -H "Content-Type: application/json" \\
-  -d '{{"features": {{"feature1": 1.0}}}}'
+  -d '{{INPUT_EXAMPLE}}'
+```
+
+`/invocations` takes `{"features": {...}}` or the bare feature mapping, and each
+item of a `/batch-invocations` JSON list may use either shape.
+
+5. **Batch inference with a binary body:**
+
+`/batch-invocations` takes a JSON list, or an `application/octet-stream` body
+holding a little-endian `uint32` row count, a `uint32` column count and then the
+rows as little-endian `float32` values, which are passed to the model without decoding:
+```python
+import struct
+import numpy as np
+import requests
+
+X = np.random.rand(1000, 2).astype("<f4")
+requests.post(
+    "http://localhost:8080/batch-invocations",
+    data=struct.pack("<II", *X.shape) + X.tobytes(),
+    headers={"Content-Type": "application/octet-stream"},
+)
 ```
 
 ### Docker Build
 
 ```bash
-docker build -t {self.model_name}:local .
-docker run -p 8080:8080 {self.model_name}:local
+docker build -t {{MODEL_NAME}}:local .
+docker run -p 8080:8080 {{MODEL_NAME}}:local
 ```
 
 ## 📁 Project Structure
@@ -735,6 +1180,7 @@ docker run -p 8080:8080 {self.model_name}:local
 .
 ├── src/
 │   ├── app.py              # Main FastAPI application
+│   ├── launcher.py         # Container entrypoint, pre-binds port 8080
 │   ├── health.py           # Health check endpoints
 │   ├── prediction.py       # Inference endpoints
 │   └── model_loader.py     # Model loading logic
@@ -742,6 +1188,7 @@ docker run -p 8080:8080 {self.model_name}:local
 │   ├── test_health.py      # Health endpoint tests
 │   └── test_inference.py   # Inference tests
 ├── Dockerfile              # Container definition
+├── nginx.conf              # Optional UNIX socket proxy (sidecar, not SageMaker)
 ├── requirements.txt        # Python dependencies
 └── release.yaml           # Deployment configuration
 ```
@@ -754,6 +1201,11 @@ Edit `release.yaml` to configure deployment settings:
 - Cache configuration
 - AWS region
 
+Outside SageMaker, set `UVICORN_UDS=/tmp/uvicorn.sock` to serve on a UNIX socket
+for an nginx sidecar running `nginx.conf`, which proxies port 8080 to it. The image
+has no nginx, so leave `UVICORN_UDS` unset on SageMaker: without a sidecar nothing
+listens on port 8080 and `/ping` and the `HEALTHCHECK` fail.
+
 ## 🧪 Testing
 
 ```bash
@@ -777,22 +1229,172 @@ Once running, visit:
 
 ## 🔍 Monitoring
 
-- CloudWatch Logs: `/aws/sagemaker/Endpoints/{self.model_name}-endpoint`
-- Metrics: SageMaker Console > Endpoints > {self.model_name}-endpoint
+- CloudWatch Logs: `/aws/sagemaker/Endpoints/{{MODEL_NAME}}-endpoint`
+- Metrics: SageMaker Console > Endpoints > {{MODEL_NAME}}-endpoint
+'''.encode("utf-8"),
+}
+
+
+class FastAPIGenerator:
+    """Generate FastAPI wrapper for ML model deployment"""
+    
+    def __init__(self, model_name: str, base_path: Union[str, os.PathLike] = ".",
+                 features: Optional[List[str]] = None):
+        self.model_name = model_name
+        self.base_path = Path(base_path)
+        self.src_path = self.base_path / "src"
+        self.tests_path = self.base_path / "tests"
+        self.features = list(features or [])
+        for name in self.features:
+            if not name.isidentifier() or keyword.iskeyword(name):
+                raise ValueError(f"Invalid feature name: {name!r}")
+            # pydantic treats _names as private attributes and reserves model_*
+            if name.startswith(("_", "model_")) or name in _RESERVED_FEATURE_NAMES:
+                raise ValueError(f"Feature name {name!r} is reserved by the generated pydantic schema")
+    
+    def _example_features(self) -> Dict[str, Any]:
+        """Example input features, used for warmup, docs and tests"""
+        if self.features:
+            return {name: float(i + 1) for i, name in enumerate(self.features)}
+        return {"feature1": 1.0, "feature2": 2.0}
+    
+    def _input_schema(self) -> str:
+        """Input schema source, a concrete numeric model when feature names are known"""
+        example = json.dumps({"features": self._example_features()})
+        if not self.features:
+            return f'''class PredictionInput(BaseModel):
+    """Input schema for predictions"""
+    model_config = ConfigDict(
+        frozen=True,
+        extra="ignore",
+        json_schema_extra={{"example": {example}}}
+    )
+    
+    features: Dict[str, Any] = Field(..., description="Input features for prediction")
+'''
+        
+        fields = "\n".join(f'    {name}: float = Field(..., description="{name}")'
+                           for name in self.features)
+        return f'''class InputFeatures(BaseModel):
+    """Numeric input features, in model column order"""
+    model_config = ConfigDict(frozen=True, extra="ignore")
+    
+{fields}
+
+class PredictionInput(BaseModel):
+    """Input schema for predictions"""
+    model_config = ConfigDict(
+        frozen=True,
+        extra="ignore",
+        json_schema_extra={{"example": {example}}}
+    )
+    
+    features: InputFeatures = Field(..., description="Input features for prediction")
 '''
+    
+    def generate_all(self):
+        """Generate complete FastAPI structure"""
+        self._create_directories()
         
-        with open(self.base_path / "README.md", "w") as f:
-            f.write(content)
+        # Render everything in memory first, then write the files in parallel
+        files = [
+            self._generate_app_py(),
+            self._generate_health_py(),
+            self._generate_prediction_py(),
+            self._generate_model_loader_py(),
+            self._generate_launcher_py(),
+            self._generate_dockerfile(),
+            self._generate_requirements_txt(),
+            self._generate_dockerignore(),
+            self._generate_nginx_conf(),
+            *self._generate_tests(),
+            self._generate_readme(),
+        ]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda file: file[0].write_bytes(file[1]), files))
+        print(f"✅ FastAPI wrapper generated successfully for {self.model_name}")
+    
+    def _create_directories(self):
+        """Create project directory structure"""
+        self.src_path.mkdir(parents=True, exist_ok=True)
+        self.tests_path.mkdir(parents=True, exist_ok=True)
+        (self.src_path / "__init__.py").touch()
+        (self.tests_path / "__init__.py").touch()
+    
+    def _generate_app_py(self) -> Tuple[Path, bytes]:
+        """Generate main FastAPI application"""
+        content = _TEMPLATES["app_py"].replace(
+            b"{{MODEL_NAME}}", self.model_name.encode("utf-8")
+        ).replace(
+            b"{{WARMUP_INPUT}}", json.dumps(self._example_features()).encode("utf-8")
+        )
+        return self.src_path / "app.py", content
+    
+    def _generate_health_py(self) -> Tuple[Path, bytes]:
+        """Generate health check endpoint"""
+        return self.src_path / "health.py", _TEMPLATES["health_py"]
+    
+    def _generate_prediction_py(self) -> Tuple[Path, bytes]:
+        """Generate prediction endpoint"""
+        content = _TEMPLATES["prediction_py"].replace(
+            b"{{INPUT_SCHEMA}}", self._input_schema().encode("utf-8")
+        )
+        return self.src_path / "prediction.py", content
+    
+    def _generate_model_loader_py(self) -> Tuple[Path, bytes]:
+        """Generate model loader module"""
+        return self.src_path / "model_loader.py", _TEMPLATES["model_loader_py"]
+
+    def _generate_launcher_py(self) -> Tuple[Path, bytes]:
+        """Generate container entrypoint that pre-binds the serving socket"""
+        return self.src_path / "launcher.py", _TEMPLATES["launcher_py"]
+
+    def _generate_dockerfile(self) -> Tuple[Path, bytes]:
+        """Generate Dockerfile"""
+        return self.base_path / "Dockerfile", _TEMPLATES["dockerfile"]
+    
+    def _generate_requirements_txt(self) -> Tuple[Path, bytes]:
+        """Generate requirements.txt"""
+        return self.base_path / "requirements.txt", _TEMPLATES["requirements_txt"]
+    
+    def _generate_dockerignore(self) -> Tuple[Path, bytes]:
+        """Generate .dockerignore"""
+        return self.base_path / ".dockerignore", _TEMPLATES["dockerignore"]
+
+    def _generate_nginx_conf(self) -> Tuple[Path, bytes]:
+        """Generate nginx.conf for the optional UNIX socket mode (sidecar only)"""
+        return self.base_path / "nginx.conf", _TEMPLATES["nginx_conf"]
+
+    def _generate_tests(self) -> List[Tuple[Path, bytes]]:
+        """Generate test files"""
+        test_inference = _TEMPLATES["test_inference_py"].replace(
+            b"{{INPUT_EXAMPLE}}", json.dumps({"features": self._example_features()}).encode("utf-8")
+        )
+        return [
+            (self.tests_path / "test_health.py", _TEMPLATES["test_health_py"]),
+            (self.tests_path / "test_inference.py", test_inference),
+        ]
+    
+    def _generate_readme(self) -> Tuple[Path, bytes]:
+        """Generate README.md"""
+        content = _TEMPLATES["readme_md"].replace(
+            b"{{MODEL_NAME}}", self.model_name.encode("utf-8")
+        ).replace(
+            b"{{INPUT_EXAMPLE}}", json.dumps({"features": self._example_features()}).encode("utf-8")
+        )
+        return self.base_path / "README.md", content
 
 
-def generate_fastapi_wrapper(model_name: str, output_path: str = "."):
+def generate_fastapi_wrapper(model_name: str, output_path: Union[str, os.PathLike] = ".",
+                             features: Optional[List[str]] = None):
     """
     Generate complete FastAPI wrapper for ML model
     
     Args:
         model_name: Name of the model
         output_path: Output directory path
+        features: Numeric input feature names, in model column order (free-form dict if omitted)
     """
-    generator = FastAPIGenerator(model_name, output_path)
+    generator = FastAPIGenerator(model_name, output_path, features)
     generator.generate_all()
     return generator
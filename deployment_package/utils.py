@@ -2,16 +2,21 @@
 Utility functions for deployment progress tracking and reporting.
 """
 
+import os
 import subprocess
 import sys
-from typing import Dict, Any
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Union, TYPE_CHECKING
 from datetime import datetime
 
+if TYPE_CHECKING:
+    from config import UserInputs
+
 
 def show_progress(msg: str):
-    """Display progress message with timestamp"""
+    """Display progress message with timestamp, one line per line of msg"""
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{timestamp}] {msg}")
+    sys.stdout.write("".join(f"[{timestamp}] {line}\n" for line in msg.split("\n")))
     sys.stdout.flush()
 
 
@@ -46,8 +51,14 @@ class UserInputCollector:
         "8": ("ml.g4dn.xlarge", "GPU Accelerated - 4 vCPU, 16GB RAM, 1 GPU"),
     }
     
-    def collect_all_inputs(self, model_name: str) -> Dict[str, Any]:
-        """Collect all user inputs interactively"""
+    def collect_all_inputs(self, model_name: str,
+                           defaults_path: Optional[Union[str, os.PathLike]] = None) -> "UserInputs":
+        """Collect all user inputs interactively, or from defaults_path without prompting"""
+        from config import UserInputs
+        
+        if defaults_path is not None:
+            return self.collect_from_stream(model_name, Path(defaults_path).read_bytes())
+        
         print("\n" + "="*60)
         print(f"🚀 ML Model Deployment Configuration: {model_name}")
         print("="*60 + "\n")
@@ -83,10 +94,28 @@ class UserInputCollector:
         # Volume size
         config["volume_size"] = self._ask_volume_size()
         
+        # Model input features
+        config["features"] = self._ask_features()
+        
+        inputs = UserInputs.from_mapping(config)
+        
         # Display summary
-        self._display_summary(config)
+        self._display_summary(inputs)
         
-        return config
+        return inputs
+    
+    def collect_from_stream(self, model_name: str, data: bytes) -> "UserInputs":
+        """Parse all inputs at once from a piped YAML/JSON document (non-interactive runs)"""
+        from config import UserInputs, load_yaml
+        
+        inputs = load_yaml(data) or {}
+        if not isinstance(inputs, dict):
+            raise ValueError("Piped configuration must be a YAML/JSON mapping")
+        
+        config = {**inputs, "model_name": model_name}
+        if isinstance(config.get("features"), str):
+            config["features"] = self._split_features(config["features"])
+        return UserInputs.from_mapping(config)
     
     def _ask_environment(self) -> str:
         """Ask for deployment environment"""
@@ -182,25 +211,36 @@ class UserInputCollector:
         except ValueError:
             return 50
     
-    def _display_summary(self, config: Dict[str, Any]):
+    def _ask_features(self) -> List[str]:
+        """Ask for numeric model input feature names"""
+        names = input("\nInput feature names, comma-separated (default: free-form): ")
+        return self._split_features(names)
+    
+    @staticmethod
+    def _split_features(names: str) -> List[str]:
+        """Split a comma-separated feature list"""
+        return [name.strip() for name in names.split(",") if name.strip()]
+    
+    def _display_summary(self, inputs: "UserInputs"):
         """Display configuration summary"""
         print("\n" + "="*60)
         print("📋 Configuration Summary")
         print("="*60)
-        print(f"Model Name:         {config['model_name']}")
-        print(f"Environment:        {config['environment']}")
-        print(f"Instance Type:      {config['instance_type']}")
-        print(f"Instance Count:     {config['instance_count']}")
-        print(f"Auto-scaling:       {'Enabled' if config.get('enable_autoscaling') else 'Disabled'}")
-        if config.get('enable_autoscaling'):
-            print(f"  Min Instances:    {config.get('min_instances')}")
-            print(f"  Max Instances:    {config.get('max_instances')}")
-        print(f"Caching:            {'Enabled' if config.get('enable_cache') else 'Disabled'}")
-        if config.get('enable_cache'):
-            print(f"  Cache TTL:        {config.get('cache_ttl')}s")
-        print(f"AWS Region:         {config['aws_region']}")
-        print(f"Team:               {config['team_name']}")
-        print(f"Volume Size:        {config['volume_size']} GB")
+        print(f"Model Name:         {inputs.model_name}")
+        print(f"Environment:        {inputs.environment}")
+        print(f"Instance Type:      {inputs.instance_type}")
+        print(f"Instance Count:     {inputs.instance_count}")
+        print(f"Auto-scaling:       {'Enabled' if inputs.enable_autoscaling else 'Disabled'}")
+        if inputs.enable_autoscaling:
+            print(f"  Min Instances:    {inputs.min_instances}")
+            print(f"  Max Instances:    {inputs.max_instances}")
+        print(f"Caching:            {'Enabled' if inputs.enable_cache else 'Disabled'}")
+        if inputs.enable_cache:
+            print(f"  Cache TTL:        {inputs.cache_ttl}s")
+        print(f"AWS Region:         {inputs.aws_region}")
+        print(f"Team:               {inputs.team_name}")
+        print(f"Volume Size:        {inputs.volume_size} GB")
+        print(f"Input Features:     {', '.join(inputs.features) or 'free-form'}")
         print("="*60 + "\n")
         
         confirm = input("Proceed with this configuration? (y/n): ").strip().lower()